@@ -2,8 +2,182 @@ import os
 import subprocess
 import shutil
 import sys
+import json
+import hashlib
+import importlib.util
+import site
+import zipfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
+# Pacote pip -> módulo importável
+DEPENDENCIAS = {
+    'pyinstaller': 'PyInstaller',
+    'pyodbc': 'pyodbc',
+    'pandas': 'pandas',
+    'openpyxl': 'openpyxl',
+    'pyexcelerate': 'pyexcelerate',
+    'pillow': 'PIL',
+}
+
+# Resultado da última verificação de dependências
+STAMP_DEPENDENCIAS = '.build_deps.json'
+
+# Spec versionado: reaproveita a análise do PyInstaller entre builds
+# (UPX desligado e módulos pesados excluídos ficam só nele)
+SPEC_FILE = 'SistemaPDV.spec'
+
+EXE_PATH = os.path.join('dist', 'SistemaPDV.exe')
+FINGERPRINT_FILE = EXE_PATH + '.fingerprint'
+
+def _chave_ambiente():
+    """Chave do ambiente Python (versão + site-packages)"""
+    h = hashlib.sha1()
+    h.update(sys.version.encode())
+    h.update(sys.executable.encode())
+    # Instalar/remover pacotes altera o mtime dos site-packages
+    pastas = site.getsitepackages() + [site.getusersitepackages()]
+    for pasta in pastas:
+        if os.path.isdir(pasta):
+            h.update(f"{pasta}:{os.stat(pasta).st_mtime_ns}".encode())
+    return h.hexdigest()
+
+def verificar_dependencias():
+    """Verificar dependências e instalar as ausentes numa única chamada pip
+
+    Retorna False se a instalação falhar (o build não deve continuar).
+    """
+    chave = _chave_ambiente()
+    try:
+        with open(STAMP_DEPENDENCIAS, 'r', encoding='utf-8') as f:
+            if json.load(f).get('chave') == chave:
+                print("✅ Dependências verificadas (cache)")
+                return True
+    except (OSError, ValueError):
+        pass
+    
+    # find_spec não executa o __init__ dos pacotes
+    pacotes = list(DEPENDENCIAS)
+    with ThreadPoolExecutor(max_workers=len(pacotes)) as executor:
+        specs = list(executor.map(importlib.util.find_spec, DEPENDENCIAS.values()))
+    
+    faltando = []
+    for dep, spec in zip(pacotes, specs):
+        if spec is None:
+            print(f"❌ {dep} - Instalando...")
+            faltando.append(dep)
+        else:
+            print(f"✅ {dep}")
+    
+    if faltando:
+        # Saída do pip em tempo real: o erro dele aparece logo acima do resumo
+        returncode = executar_comando([sys.executable, '-m', 'pip', 'install',
+                                       '--disable-pip-version-check', *faltando])
+        if returncode != 0:
+            print(f"❌ pip install falhou (código {returncode})")
+            print(f"❌ Pacotes não instalados: {', '.join(faltando)}")
+            print(f"💡 Execute: {sys.executable} -m pip install {' '.join(faltando)}")
+            return False
+        chave = _chave_ambiente()
+    
+    with open(STAMP_DEPENDENCIAS, 'w', encoding='utf-8') as f:
+        json.dump({'chave': chave, 'dependencias': pacotes}, f)
+    return True
+
+def _arquivos_fonte(pasta):
+    """Listar recursivamente os .py de uma pasta (os.scandir)"""
+    with os.scandir(pasta) as it:
+        for entry in it:
+            if entry.is_dir(follow_symlinks=False):
+                if entry.name != '__pycache__':
+                    yield from _arquivos_fonte(entry.path)
+            elif entry.name.endswith('.py'):
+                yield entry
+
+def calcular_fingerprint():
+    """Fingerprint das fontes do build (caminho, mtime e tamanho)"""
+    entradas = []
+    for caminho in ('main.py', 'requirements.txt', SPEC_FILE, 'icone.ico', 'criar_icone.py'):
+        if os.path.exists(caminho):
+            st = os.stat(caminho)
+            entradas.append((caminho, st.st_mtime_ns, st.st_size))
+    if os.path.isdir('src'):
+        for entry in _arquivos_fonte('src'):
+            st = entry.stat()
+            entradas.append((entry.path, st.st_mtime_ns, st.st_size))
+    
+    h = hashlib.blake2b(digest_size=16)
+    for caminho, mtime, tamanho in sorted(entradas):
+        h.update(f"{caminho}:{mtime}:{tamanho}\n".encode())
+    return h.hexdigest()
+
+def build_atualizado(fingerprint):
+    """Verificar se o EXE existente corresponde às fontes atuais"""
+    if not os.path.exists(EXE_PATH):
+        return False
+    try:
+        with open(FINGERPRINT_FILE, 'r', encoding='utf-8') as f:
+            return f.read().strip() == fingerprint
+    except OSError:
+        return False
+
+def remover_pastas(pastas):
+    """Remover pastas em segundo plano
+
+    Cada pasta é renomeada (operação instantânea) e apagada em paralelo,
+    liberando o nome para a compilação seguir imediatamente.
+    """
+    executor = ThreadPoolExecutor(max_workers=len(pastas))
+    for pasta in pastas:
+        if not os.path.exists(pasta):
+            continue
+        lixeira = f"{pasta}.trash.{os.getpid()}"
+        try:
+            os.rename(pasta, lixeira)
+        except OSError:
+            # Arquivo em uso (Windows): remover de forma síncrona
+            shutil.rmtree(pasta)
+        else:
+            executor.submit(shutil.rmtree, lixeira, ignore_errors=True)
+        print(f"🗑️ Removido: {pasta}")
+    executor.shutdown(wait=False)
+
+def _preaquecer_pyinstaller():
+    """Importar o PyInstaller (import pesado) em segundo plano"""
+    try:
+        import PyInstaller.building.build_main  # noqa: F401
+    except ImportError:
+        pass  # Instalado na verificação de dependências
+
+def executar_comando(cmd):
+    """Executar comando exibindo a saída em tempo real"""
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                            text=True, bufsize=1)
+    for linha in proc.stdout:
+        sys.stdout.write(linha)
+    return proc.wait()
+
+def executar_pyinstaller(args):
+    """Executar o PyInstaller no próprio processo
+
+    Reaproveita o interpretador já carregado (e o pré-aquecimento),
+    evitando subir outro Python. Retorna o código de saída.
+    """
+    try:
+        import PyInstaller.__main__
+    except ImportError:
+        # Recém-instalado nesta execução: usar o executável
+        return executar_comando(['pyinstaller', *args])
+    
+    try:
+        PyInstaller.__main__.run(args)
+    except SystemExit as e:
+        if e.code is None:
+            return 0
+        return e.code if isinstance(e.code, int) else 1
+    return 0
+
 def build_sistema_pdv():
     """Script completo para compilar Sistema PDV"""
     
@@ -15,99 +189,117 @@ def build_sistema_pdv():
         print("❌ main.py não encontrado!")
         return False
     
+    # Nada mudou desde o último build
+    fingerprint = calcular_fingerprint()
+    if build_atualizado(fingerprint):
+        print(f"✅ Build já atualizado: {EXE_PATH}")
+        # O pacote leva a data no nome: pode faltar mesmo com o EXE em dia
+        if os.path.exists(f"{nome_pacote()}.zip"):
+            return True
+        print("\n📦 Criando pacote distribuição...")
+        return criar_pacote_distribuicao()
+    
+    # Carregar o PyInstaller enquanto ícone, dependências e limpeza rodam
+    aquecimento = threading.Thread(target=_preaquecer_pyinstaller, daemon=True)
+    aquecimento.start()
+    
     # Criar ícone
     print("🎨 Criando ícone...")
     try:
-        exec(open('criar_icone.py').read())
-    except:
-        print("⚠️ Ícone padrão será usado")
+        if (not os.path.exists('icone.ico')
+                or os.path.getmtime('icone.ico') < os.path.getmtime('criar_icone.py')):
+            from criar_icone import criar_icone_pdv
+            criar_icone_pdv()
+        else:
+            print("✅ Ícone atualizado (cache)")
+    except FileNotFoundError:
+        print("⚠️ criar_icone.py não encontrado - ícone padrão será usado")
+    except ImportError as e:
+        print(f"⚠️ Pillow/NumPy ausente ({e}) - ícone padrão será usado")
+    
+    # O ícone entra no fingerprint: recalcular se acabou de ser gerado
+    fingerprint = calcular_fingerprint()
     
     # Verificar dependências
     print("\n📦 Verificando dependências...")
-    dependencias = ['pyinstaller', 'pyodbc', 'pandas', 'openpyxl', 'pillow']
-    
-    for dep in dependencias:
-        try:
-            __import__(dep)
-            print(f"✅ {dep}")
-        except ImportError:
-            print(f"❌ {dep} - Instalando...")
-            subprocess.run([sys.executable, '-m', 'pip', 'install', dep])
+    if not verificar_dependencias():
+        print("❌ Build interrompido: dependências ausentes")
+        return False
     
-    # Limpar builds anteriores
+    # Limpar builds anteriores (build/ guarda o cache incremental do PyInstaller)
     print("\n🧹 Limpando builds anteriores...")
-    for pasta in ['build', 'dist', '__pycache__']:
-        if os.path.exists(pasta):
-            shutil.rmtree(pasta)
-            print(f"🗑️ Removido: {pasta}")
+    remover_pastas(['dist', '__pycache__'])
     
     # Comandos de compilação
     print("\n🔨 Compilando aplicação...")
     
-    cmd_basico = [
-        'pyinstaller',
-        '--onefile',           # Um arquivo só
-        '--windowed',          # Sem console
-        '--name', 'SistemaPDV', # Nome do EXE
-        '--distpath', 'dist',   # Pasta de saída
-        '--workpath', 'build',  # Pasta temporária
-        'main.py'
-    ]
-    
-    # Adicionar ícone se existir
-    if os.path.exists('icone.ico'):
-        cmd_basico.extend(['--icon', 'icone.ico'])
+    if os.path.exists(SPEC_FILE):
+        # Spec versionado: opções, exclusões e ícone ficam todos nele
+        cmd_basico = [
+            'pyinstaller',
+            '--noconfirm',
+            '--distpath', 'dist',
+            '--workpath', 'build',
+            SPEC_FILE
+        ]
+    else:
+        cmd_basico = [
+            'pyinstaller',
+            '--onefile',           # Um arquivo só
+            '--windowed',          # Sem console
+            '--name', 'SistemaPDV', # Nome do EXE
+            '--distpath', 'dist',   # Pasta de saída
+            '--workpath', 'build',  # Pasta temporária
+            'main.py'
+        ]
+        
+        # Adicionar ícone se existir
+        if os.path.exists('icone.ico'):
+            cmd_basico.extend(['--icon', 'icone.ico'])
     
     # Executar compilação
+    aquecimento.join()
     try:
-        resultado = subprocess.run(cmd_basico, capture_output=True, text=True)
+        returncode = executar_pyinstaller(cmd_basico[1:])
         
-        if resultado.returncode == 0:
+        if returncode == 0:
             print("✅ Compilação bem-sucedida!")
             
             # Verificar se EXE foi criado
-            exe_path = os.path.join('dist', 'SistemaPDV.exe')
+            exe_path = EXE_PATH
             if os.path.exists(exe_path):
+                with open(FINGERPRINT_FILE, 'w', encoding='utf-8') as f:
+                    f.write(fingerprint)
+                
                 tamanho = os.path.getsize(exe_path) / (1024*1024)  # MB
                 print(f"📁 EXE criado: {exe_path}")
                 print(f"📏 Tamanho: {tamanho:.1f} MB")
                 
                 # Criar pasta distribuição
                 print("\n📦 Criando pacote distribuição...")
-                criar_pacote_distribuicao()
-                
-                return True
+                return criar_pacote_distribuicao()
             else:
                 print("❌ EXE não foi criado!")
                 return False
         else:
-            print("❌ Erro na compilação:")
-            print(resultado.stderr)
+            print(f"❌ Erro na compilação (código {returncode}) - ver saída acima")
             return False
             
     except Exception as e:
         print(f"❌ Erro durante compilação: {e}")
         return False
 
+def nome_pacote(versao=None):
+    """Nome do pacote: SistemaPDV_v<data> (data de hoje por padrão)"""
+    return f"SistemaPDV_v{versao or datetime.now().strftime('%Y%m%d')}"
+
 def criar_pacote_distribuicao():
-    """Criar pacote completo para distribuição"""
+    """Criar pacote completo para distribuição; retorna True se criado"""
     try:
-        # Criar pasta SistemaPDV_v1.0
+        # Pacote SistemaPDV_v<data>.zip (extrai para a pasta SistemaPDV_v<data>)
         versao = datetime.now().strftime("%Y%m%d")
-        pasta_dist = f"SistemaPDV_v{versao}"
-        
-        if os.path.exists(pasta_dist):
-            shutil.rmtree(pasta_dist)
-        
-        os.makedirs(pasta_dist)
-        
-        # Copiar EXE
-        shutil.copy2('dist/SistemaPDV.exe', pasta_dist)
-        
-        # Criar pastas necessárias
-        os.makedirs(f"{pasta_dist}/dados", exist_ok=True)
-        os.makedirs(f"{pasta_dist}/relatorios", exist_ok=True)
-        os.makedirs(f"{pasta_dist}/templates", exist_ok=True)
+        pasta_dist = nome_pacote(versao)
+        arquivo_zip = f"{pasta_dist}.zip"
         
         # Criar README
         readme_content = f"""
@@ -134,9 +326,6 @@ Sistema desenvolvido para MADEIREIRA MARIA LUIZA
 Integração com SIC - Gestão de Produtos
     """
         
-        with open(f"{pasta_dist}/README.txt", 'w', encoding='utf-8') as f:
-            f.write(readme_content)
-        
         # Criar arquivo de configuração exemplo
         config_exemplo = """{
     "servidor": "localhost\\\\SQLEXPRESS",
@@ -145,14 +334,26 @@ Integração com SIC - Gestão de Produtos
     "senha": ""
 }"""
         
-        with open(f"{pasta_dist}/dados/config_exemplo.json", 'w') as f:
-            f.write(config_exemplo)
+        # Gravar tudo num único arquivo ZIP
+        with zipfile.ZipFile(arquivo_zip, 'w', zipfile.ZIP_DEFLATED, compresslevel=6) as z:
+            # EXE em blocos de 1 MiB (ZipFile.write lê de 8 KiB em 8 KiB)
+            info = zipfile.ZipInfo.from_file(EXE_PATH, f"{pasta_dist}/SistemaPDV.exe")
+            info.compress_type = zipfile.ZIP_DEFLATED
+            with open(EXE_PATH, 'rb') as origem, z.open(info, 'w') as destino:
+                shutil.copyfileobj(origem, destino, 1024 * 1024)
+            z.writestr(f"{pasta_dist}/README.txt", readme_content)
+            z.writestr(f"{pasta_dist}/dados/config_exemplo.json", config_exemplo)
+            # Pastas necessárias (entradas de diretório vazias)
+            for pasta in ('relatorios', 'templates'):
+                z.writestr(f"{pasta_dist}/{pasta}/", '')
         
-        print(f"📦 Pacote criado: {pasta_dist}/")
+        print(f"📦 Pacote criado: {arquivo_zip}")
         print("✅ Pronto para distribuição!")
+        return True
         
     except Exception as e:
         print(f"❌ Erro criar pacote: {e}")
+        return False
 
 if __name__ == "__main__":
     sucesso = build_sistema_pdv()
@@ -160,7 +361,7 @@ if __name__ == "__main__":
     if sucesso:
         print("\n" + "="*50)
         print("🎉 COMPILAÇÃO CONCLUÍDA COM SUCESSO!")
-        print("📂 Verificar pasta 'SistemaPDV_v[data]'")
+        print("📂 Verificar arquivo 'SistemaPDV_v[data].zip'")
         print("🚀 Sistema pronto para distribuição!")
     else:
         print("\n❌ Falha na compilação!")
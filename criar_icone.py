@@ -1,25 +1,40 @@
 from PIL import Image, ImageDraw, ImageFont
+import numpy as np
 import os
 
+def _retangulo(rgba, x0, y0, x1, y1, fill, outline, width=1):
+    """Preencher retângulo (bordas inclusivas, contorno para dentro, como o ImageDraw)"""
+    rgba[y0:y1+1, x0:x1+1] = outline + (255,)
+    rgba[y0+width:y1+1-width, x0+width:x1+1-width] = fill + (255,)
+
 def criar_icone_pdv():
     """Criar ícone para o sistema PDV"""
     try:
-        # Criar imagem 256x256
-        img = Image.new('RGBA', (256, 256), (45, 62, 80, 255))
-        draw = ImageDraw.Draw(img)
-        
-        # Fundo gradiente
-        for y in range(256):
-            alpha = int(255 * (1 - y/256))
-            color = (52, 152, 219, alpha)
-            draw.line([(0, y), (256, y)], fill=color)
+        # Criar imagem 256x256 com fundo gradiente (alpha decrescente por linha)
+        alpha = (255 * (1 - np.arange(256) / 256)).astype(np.uint8)
+        rgba = np.empty((256, 256, 4), np.uint8)
+        rgba[..., :3] = (52, 152, 219)
+        rgba[..., 3] = alpha[:, None]
         
         # Desenhar caixa registradora simplificada
         # Base
-        draw.rectangle([40, 160, 216, 220], fill=(236, 240, 241), outline=(52, 73, 94), width=3)
+        _retangulo(rgba, 40, 160, 216, 220, fill=(236, 240, 241), outline=(52, 73, 94), width=3)
         
         # Tela
-        draw.rectangle([60, 80, 196, 140], fill=(46, 204, 113), outline=(39, 174, 96), width=2)
+        _retangulo(rgba, 60, 80, 196, 140, fill=(46, 204, 113), outline=(39, 174, 96), width=2)
+        
+        # Botões caixa: grade 3x4 de 26x9 px, escrita de uma vez via np.ix_
+        ys = 175 + 12 * np.arange(3)
+        xs = 55 + 35 * np.arange(4)
+        linhas = np.add.outer(ys, np.arange(9)).ravel()
+        colunas = np.add.outer(xs, np.arange(26)).ravel()
+        rgba[np.ix_(linhas, colunas)] = (127, 140, 141, 255)
+        linhas = np.add.outer(ys, np.arange(1, 8)).ravel()
+        colunas = np.add.outer(xs, np.arange(1, 25)).ravel()
+        rgba[np.ix_(linhas, colunas)] = (189, 195, 199, 255)
+        
+        img = Image.fromarray(rgba, 'RGBA')
+        draw = ImageDraw.Draw(img)
         
         # Texto PDV
         try:
@@ -31,13 +46,6 @@ def criar_icone_pdv():
         # Texto na tela
         draw.text((128, 110), "PDV", fill=(255, 255, 255), font=font, anchor="mm")
         
-        # Botões caixa
-        for i in range(3):
-            for j in range(4):
-                x = 55 + j*35
-                y = 175 + i*12
-                draw.rectangle([x, y, x+25, y+8], fill=(189, 195, 199), outline=(127, 140, 141))
-        
         # Salvar como ICO
         img.save('icone.ico', format='ICO', sizes=[(256,256), (128,128), (64,64), (32,32), (16,16)])
         print("✅ Ícone criado: icone.ico")
@@ -1,6 +1,27 @@
 import subprocess
 import sys
 import os
+import threading
+import glob
+
+from build_sistema import remover_pastas
+
+def executar_pyinstaller(cmd, timeout=300):
+    """Executar PyInstaller exibindo a saída em tempo real"""
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                            text=True, bufsize=1)
+    timer = threading.Timer(timeout, proc.kill)
+    timer.start()
+    try:
+        for linha in proc.stdout:
+            sys.stdout.write(linha)
+        returncode = proc.wait()
+    finally:
+        expirou = not timer.is_alive()
+        timer.cancel()
+    if expirou:
+        raise subprocess.TimeoutExpired(cmd, timeout)
+    return returncode
 
 def debug_compilacao():
     """Debug da compilação PyInstaller"""
@@ -26,29 +47,23 @@ def debug_compilacao():
         
     # Limpar builds anteriores
     print("\n🧹 Limpando builds anteriores...")
-    for pasta in ["build", "dist"]:
-        if os.path.exists(pasta):
-            import shutil
-            shutil.rmtree(pasta)
-            print(f"🗑️ Removido: {pasta}")
+    remover_pastas(["build", "dist"])
     
-    # Remover .spec antigos
-    for arquivo in os.listdir("."):
-        if arquivo.endswith(".spec"):
-            os.remove(arquivo)
-            print(f"🗑️ Removido: {arquivo}")
+    # Remover .spec antigos (SistemaPDV.spec é versionado)
+    with os.scandir(".") as it:
+        for entry in it:
+            if entry.name.endswith(".spec") and entry.name != "SistemaPDV.spec" and entry.is_file():
+                os.unlink(entry.path)
+                print(f"🗑️ Removido: {entry.name}")
     
     print("\n🔨 Tentativa 1: Compilação básica...")
     try:
-        resultado = subprocess.run([
+        executar_pyinstaller([
             "pyinstaller", 
             "--onefile", 
+            "--workpath", "build",
             "main.py"
-        ], capture_output=True, text=True, timeout=300)
-        
-        print("STDOUT:", resultado.stdout)
-        if resultado.stderr:
-            print("STDERR:", resultado.stderr)
+        ])
         
         if os.path.exists("dist/main.exe"):
             print("✅ Sucesso! EXE criado em dist/main.exe")
@@ -63,25 +78,27 @@ def debug_compilacao():
     except Exception as e:
         print(f"❌ Erro: {e}")
     
-    print("\n🔨 Tentativa 2: Com console (debug)...")
-    try:
-        resultado = subprocess.run([
-            "pyinstaller", 
-            "--onefile", 
-            "--console",
-            "main.py"
-        ], capture_output=True, text=True, timeout=300)
-        
-        print("STDOUT:", resultado.stdout)
-        if resultado.stderr:
-            print("STDERR:", resultado.stderr)
-            
-        if os.path.exists("dist/main.exe"):
-            print("✅ Sucesso com console! Teste o EXE")
-            return True
-            
-    except Exception as e:
-        print(f"❌ Erro tentativa 2: {e}")
+    # Sem Analysis concluída a Tentativa 2 falharia igual: a saída acima já mostra o erro
+    if not glob.glob(os.path.join("build", "main", "Analysis-*.toc")):
+        print("\n❌ Falha na análise de dependências - ver saída da Tentativa 1")
+    else:
+        # Reaproveita build/ da Tentativa 1 (Analysis/PYZ em cache)
+        print("\n🔨 Tentativa 2: Com console (debug)...")
+        try:
+            executar_pyinstaller([
+                "pyinstaller", 
+                "--onefile", 
+                "--console",
+                "--workpath", "build",
+                "main.py"
+            ])
+                
+            if os.path.exists("dist/main.exe"):
+                print("✅ Sucesso com console! Teste o EXE")
+                return True
+                
+        except Exception as e:
+            print(f"❌ Erro tentativa 2: {e}")
     
     print("\n💡 POSSÍVEIS SOLUÇÕES:")
     print("1. Verificar se Python está no PATH")
@@ -4,19 +4,37 @@ Demonstration script showing the security and validation improvements
 This simulates the enhanced system functionality without requiring GUI
 """
 import sys
-import os
+import io
+import functools
+from contextlib import redirect_stdout
 
-# Add project root to Python path
-sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+@functools.lru_cache(maxsize=None)
+def get_validator():
+    """Single validator shared by all demonstrations, created on first use"""
+    from src.validation.product_validator import ProductValidator
+    return ProductValidator()
 
-from src.validation.product_validator import ProductValidator
-from src.security.config_manager import SecureConfigManager
+def buffered_output(func):
+    """Collect everything a demo prints and emit it with a single write"""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        buf = io.StringIO()
+        try:
+            with redirect_stdout(buf):
+                return func(*args, **kwargs)
+        finally:
+            sys.stdout.write(buf.getvalue())
+            sys.stdout.flush()
+    return wrapper
 
+@buffered_output
 def demonstrate_security_improvements():
     """Demonstrate the security improvements"""
     print("🔒 SECURITY IMPROVEMENTS DEMONSTRATION")
     print("=" * 50)
     
+    from src.security.config_manager import SecureConfigManager
+    
     config_manager = SecureConfigManager()
     
     print("1. Secure Configuration Management:")
@@ -40,12 +58,13 @@ def demonstrate_security_improvements():
     
     print("\n✅ Security improvements successfully implemented!")
 
+@buffered_output
 def demonstrate_validation_improvements():
     """Demonstrate the validation improvements"""
     print("\n\n📋 PRODUCT VALIDATION IMPROVEMENTS")
     print("=" * 50)
     
-    validator = ProductValidator()
+    validator = get_validator()
     
     print("1. Enhanced Validation Features:")
     print("   ✅ Real-time field validation")
@@ -113,6 +132,7 @@ def demonstrate_validation_improvements():
     
     print("\n✅ Validation improvements successfully implemented!")
 
+@buffered_output
 def demonstrate_ui_improvements():
     """Demonstrate the UI improvements"""
     print("\n\n🎨 USER INTERFACE IMPROVEMENTS")
@@ -138,13 +158,13 @@ def demonstrate_ui_improvements():
     print("   ✅ Connection error feedback")
     print("   ✅ Progress indicators for long operations")
     
-    validator = ProductValidator()
-    price_display = validator.format_price_display("1234.56")
+    price_display = get_validator().format_price_display("1234.56")
     print(f"\n4. Enhanced Formatting:")
     print(f"   Example price display: {price_display}")
     
     print("\n✅ UI improvements successfully implemented!")
 
+@buffered_output
 def demonstrate_integration():
     """Demonstrate how all improvements work together"""
     print("\n\n🔧 INTEGRATION DEMONSTRATION")
@@ -1,18 +1,208 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog, simpledialog
 import sqlite3
-import subprocess
+import importlib
+from contextlib import contextmanager
+from collections import namedtuple
+import json
 import os
 import sys
 from datetime import datetime
 import threading
+import queue
 import time
 
 # Import our enhanced modules
 from src.security.config_manager import SecureConfigManager
 from src.validation.product_validator import ProductValidator
 
+# Talão de balcão: só número e data mudam a cada impressão
+_SEP = "=" * 60
+_TALAO_TEMPLATE = f"""
+{_SEP}
+           MADEIREIRA MARIA LUIZA
+        Rua das Madeiras, 456 - Sua Cidade - SP
+            (11) 9999-8888 | CNPJ: XX.XXX.XXX/0001-XX
+{_SEP}
+
+              TALÃO DE BALCÃO - VIA CLIENTE
+
+Nº: {{numero}}        Data: {{data}}
+Vendedor: ________________________________
+
+Cliente: _____________________________________
+CPF/CNPJ: ___________________________________
+
+{_SEP}
+Cód. | Descrição                    | Qtd | Preço  | Total
+{_SEP}
+     |                              |     |        |
+     |                              |     |        |
+     |                              |     |        |
+     |                              |     |        |
+     |                              |     |        |
+     |                              |     |        |
+{_SEP}
+
+                              SUBTOTAL: R$ _______
+                              DESCONTO: R$ _______
+                                 TOTAL: R$ _______
+
+Forma Pagamento: ____________________________
+
+Observações:
+_____________________________________________
+_____________________________________________
+
+{_SEP}
+    Obrigado pela preferência! Volte sempre!
+           MADEIREIRA MARIA LUIZA
+{_SEP}
+"""
+
+# Linha de produtos lida por código (mesma ordem de SQL_PRODUTO_POR_CODIGO)
+Produto = namedtuple(
+    "Produto", "codigo descricao preco_venda preco_custo estoque categoria ativo marca unidade peso"
+)
+
+# Locais comuns do LibreOffice Calc no Windows
+CALC_PATHS = (
+    r"C:\Program Files\LibreOffice\program\scalc.exe",
+    r"C:\Program Files (x86)\LibreOffice\program\scalc.exe",
+    r"C:\LibreOffice\program\scalc.exe",
+)
+
+# Planilhas base (CSV) dos templates do LibreOffice, já codificadas
+TEMPLATES = {
+    "talao_cliente": """EMPRESA,MADEIREIRA MARIA LUIZA 
+ENDEREÇO,Rua do Comércio 123 - Sua Cidade - SP
+TELEFONE,(11) 1234-5678
+CNPJ,XX.XXX.XXX/0001-XX
+
+DOCUMENTO,TALÃO DE BALCÃO - VIA CLIENTE
+NÚMERO,
+DATA,
+VENDEDOR,
+
+CLIENTE,
+CPF/CNPJ,
+
+CÓDIGO,DESCRIÇÃO,QTD,PREÇO,TOTAL
+""".encode("utf-8"),
+    "talao_loja": """EMPRESA,MADEIREIRA MARIA LUIZA 
+ENDEREÇO,Rua do Comércio 123 - Sua Cidade - SP
+TELEFONE,(11) 1234-5678
+CNPJ,XX.XXX.XXX/0001-XX
+
+DOCUMENTO,TALÃO DE BALCÃO - VIA LOJA
+NÚMERO,
+DATA,
+VENDEDOR,
+
+CLIENTE,
+CPF/CNPJ,
+
+CÓDIGO,DESCRIÇÃO,QTD,PREÇO,TOTAL
+""".encode("utf-8"),
+    "relatorio": """EMPRESA,MADEIREIRA MARIA LUIZA 
+RELATÓRIO,PRODUTOS EM ESTOQUE
+DATA,
+TOTAL PRODUTOS,
+VALOR ESTOQUE,
+
+CÓDIGO,DESCRIÇÃO,PREÇO,ESTOQUE,TOTAL
+""".encode("utf-8"),
+}
+
 class SistemaPDV:
+    # Consultas fixas: mesmo texto SQL sempre, reaproveitado pelo cache de statements do sqlite3
+    SQL_LISTAR_PRODUTOS = """
+        SELECT codigo, descricao, preco_venda, preco_custo, estoque, categoria, ativo
+        FROM produtos 
+        ORDER BY descricao
+        LIMIT 1000
+    """
+    SQL_BUSCAR_PRODUTOS = """
+        SELECT codigo, descricao, preco_venda, estoque
+        FROM produtos 
+        WHERE codigo LIKE ? OR descricao LIKE ?
+        ORDER BY descricao
+        LIMIT 100
+    """
+    # {extras}: marca/unidade/peso só existem em bancos criados pelo LocalDatabase
+    SQL_PRODUTO_POR_CODIGO = """
+        SELECT codigo, descricao, preco_venda, preco_custo, estoque, categoria, ativo, {extras}
+        FROM produtos
+        WHERE codigo = ?
+    """
+    SQL_EXCLUIR_PRODUTO = "DELETE FROM produtos WHERE codigo = ?"
+    # Totais do estoque: compartilhado pelos dois relatórios
+    SQL_RESUMO_ESTOQUE = """
+        SELECT COUNT(*),
+               COALESCE(SUM(preco_venda * estoque), 0),
+               COALESCE(SUM(estoque <= 0), 0),
+               COALESCE(AVG(preco_venda), 0)
+        FROM produtos
+    """
+    SQL_ANALISE_PRECOS = """
+        SELECT AVG(preco_venda), MIN(preco_venda), MAX(preco_venda), COUNT(*)
+        FROM produtos
+        WHERE preco_venda > 0
+    """
+
+    # Colunas (e larguras) fixas das listas da interface
+    COLUNAS_PRODUTOS = ("Código", "Descrição", "Preço Venda", "Preço Custo", "Estoque", "Categoria", "Status")
+    LARGURAS_PRODUTOS = (100, 250, 100, 100, 80, 120, 80)
+    COLUNAS_PDV = ("Código", "Descrição", "Preço", "Estoque")
+    COLUNAS_CARRINHO = ("Código", "Descrição", "Qtd", "Preço", "Total")
+    COLUNAS_FALTA = ("Código", "Descrição", "Estoque")
+
+    # Drivers ODBC do SQL Server em ordem de preferência (o legado por último)
+    DRIVERS_SIC = (
+        "ODBC Driver 18 for SQL Server",
+        "ODBC Driver 17 for SQL Server",
+        "SQL Server Native Client 11.0",
+        "SQL Server",
+    )
+
+    # Esquema do banco local; aumentar SCHEMA_VERSION ao alterar o DDL
+    SCHEMA_VERSION = 3
+    DDL_BANCO_LOCAL = f"""
+        BEGIN;
+        
+        -- Tabela produtos
+        CREATE TABLE IF NOT EXISTS produtos (
+            codigo TEXT PRIMARY KEY,
+            descricao TEXT,
+            preco_venda REAL,
+            preco_custo REAL,
+            estoque INTEGER,
+            categoria TEXT,
+            ativo INTEGER DEFAULT 1,
+            ultima_atualizacao TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+        
+        -- Tabela cache info
+        CREATE TABLE IF NOT EXISTS cache_info (
+            tipo TEXT PRIMARY KEY,
+            ultimo_update TIMESTAMP,
+            total_registros INTEGER
+        );
+        
+        -- Índice por descrição: ORDER BY descricao sem ordenação extra
+        CREATE INDEX IF NOT EXISTS idx_prod_desc ON produtos(descricao);
+        
+        -- Índices parciais: produtos em falta (por descrição) e análise de preços
+        CREATE INDEX IF NOT EXISTS idx_produtos_falta ON produtos(descricao) WHERE estoque <= 0;
+        CREATE INDEX IF NOT EXISTS idx_produtos_preco ON produtos(preco_venda) WHERE preco_venda > 0;
+        
+        -- Índice de cobertura dos totais do estoque: varre só preço e estoque
+        CREATE INDEX IF NOT EXISTS idx_produtos_valor ON produtos(preco_venda, estoque);
+        
+        PRAGMA user_version = {SCHEMA_VERSION};
+        COMMIT;
+    """
+
     def __init__(self):
         self.root = tk.Tk()
         self.root.title("🌲 Sistema PDV - Madeireira Maria Luiza")
@@ -23,6 +213,29 @@ class SistemaPDV:
         self.modo_offline = True
         self.conn_sic = None
         self.dados_cache = {}
+        self._modulos = {}  # pyodbc/pandas importados sob demanda
+        self._log_enabled = True  # Desligado ao fechar a janela
+        self._log_buffer = []  # Mensagens aguardando o próximo _flush_log
+        self._log_flush_scheduled = False
+        self._log_lines = 0  # Linhas atualmente no text_log
+        self._sync_thread = None  # Thread única de sincronização, criada no primeiro pedido
+        self._sync_fila = queue.Queue()
+        self._sync_em_andamento = False
+        self._last_sync_ts = None  # Fim da última sincronização bem-sucedida
+        self._cursores = threading.local()  # Um cursor do banco local por thread
+        self._db_lock = threading.RLock()  # Serializa o uso de conn_local entre threads
+        self._relatorios_ready = False
+        self._calc_exe = None  # scalc.exe do LibreOffice, resolvido no primeiro uso
+        self._cache_produtos = {}  # LRU código -> linha do produto (mais recente no fim)
+        self._desfazer = None  # Salvamento desfazível (estado anterior), só enquanto o aviso está na tela
+        self._aviso_desfazer = None  # Aviso "Desfazer" na tela (um por vez)
+        self._aviso_after_id = None  # Expiração do aviso
+        
+        # Sonda de disponibilidade do SIC (conexão reaproveitada)
+        self._sic_conn_str = None
+        self._probe_conn = None
+        self._driver = None  # Driver ODBC detectado no primeiro uso
+        self._probe_lock = threading.Lock()
         
         # Initialize security and validation
         self.config_manager = SecureConfigManager()
@@ -32,18 +245,24 @@ class SistemaPDV:
         self.session_start_time = None
         self.session_timeout_minutes = self.config_manager.get_session_timeout()
         
-        self.criar_interface()
+        # Sinaliza às threads de background que a janela foi fechada
+        self._stop_event = threading.Event()
+        self._sic_after_id = None  # Próxima verificação do SIC agendada no Tk
+        self._busca_after_ids = {}  # Por campo de busca: busca aguardando o fim da digitação
+        self._busca_textos = {}  # Por campo de busca: último texto enviado para busca
+        self._backup_after_id = None  # Próxima verificação de backup agendada no Tk
+        
+        # Banco local antes da interface: as abas já consultam produtos
         self.criar_banco_local()
+        self.criar_interface()
+        self.root.protocol("WM_DELETE_WINDOW", self.fechar)
         self.verificar_sic_periodicamente()
         self.inicializar_sistema_backup()
         
-        # Fazer backup inicial se habilitado
+        # Fazer backup inicial se habilitado (em background: a janela abre já)
         if self.var_backup_auto.get():
-            try:
-                self.fazer_backup()
-            except:
-                pass
-        
+            self._backup_em_background("💾 Backup inicial concluído")
+        
     def criar_interface(self):
         """Interface principal do sistema"""
         # Título
@@ -174,17 +393,14 @@ class SistemaPDV:
         ttk.Label(toolbar, text="Buscar:").pack(side=tk.LEFT, padx=(20,5))
         self.entry_busca = ttk.Entry(toolbar, width=30)
         self.entry_busca.pack(side=tk.LEFT, padx=5)
-        self.entry_busca.bind('<Return>', lambda e: self.buscar_produto())
+        self.entry_busca.bind('<KeyRelease>', lambda e: self._busca_digitada(e, self.buscar_produto))
         
         # Lista produtos
-        colunas = ("Código", "Descrição", "Preço Venda", "Preço Custo", "Estoque", "Categoria", "Status")
-        self.tree_produtos = ttk.Treeview(frame_produtos, columns=colunas, show="headings", height=15)
+        self.tree_produtos = ttk.Treeview(frame_produtos, columns=self.COLUNAS_PRODUTOS, show="headings", height=15)
+        self._codigos_produtos = []  # Código (texto) de cada linha, na ordem da lista
         
         # Configure column widths
-        column_widths = {"Código": 100, "Descrição": 250, "Preço Venda": 100, "Preço Custo": 100, "Estoque": 80, "Categoria": 120, "Status": 80}
-        for col in colunas:
-            self.tree_produtos.heading(col, text=col)
-            self.tree_produtos.column(col, width=column_widths.get(col, 100))
+        self._configurar_colunas(self.tree_produtos, self.COLUNAS_PRODUTOS, self.LARGURAS_PRODUTOS)
         
         # Enable selection
         self.tree_produtos.bind('<Double-1>', lambda e: self.editar_produto())
@@ -219,17 +435,15 @@ class SistemaPDV:
         ttk.Label(frame_busca_pdv, text="Código/Descrição:").pack(side=tk.LEFT)
         self.entry_busca_pdv = ttk.Entry(frame_busca_pdv, width=30)
         self.entry_busca_pdv.pack(side=tk.LEFT, padx=5, fill=tk.X, expand=True)
-        self.entry_busca_pdv.bind('<Return>', lambda e: self.buscar_produto_pdv())
+        self.entry_busca_pdv.bind('<KeyRelease>', lambda e: self._busca_digitada(e, self.buscar_produto_pdv))
         
         ttk.Button(frame_busca_pdv, text="🔍", command=self.buscar_produto_pdv).pack(side=tk.RIGHT)
         
         # Lista produtos PDV
-        colunas_pdv = ("Código", "Descrição", "Preço", "Estoque")
-        self.tree_produtos_pdv = ttk.Treeview(frame_esquerdo, columns=colunas_pdv, show="headings", height=10)
+        self.tree_produtos_pdv = ttk.Treeview(frame_esquerdo, columns=self.COLUNAS_PDV, show="headings", height=10)
+        self._pdv_linhas = []  # (código, preço numérico) de cada linha, na ordem da lista
         
-        for col in colunas_pdv:
-            self.tree_produtos_pdv.heading(col, text=col)
-            self.tree_produtos_pdv.column(col, width=120)
+        self._configurar_colunas(self.tree_produtos_pdv, self.COLUNAS_PDV, (120,) * len(self.COLUNAS_PDV))
         
         self.tree_produtos_pdv.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
         self.tree_produtos_pdv.bind('<Double-1>', lambda e: self.adicionar_ao_carrinho())
@@ -243,12 +457,9 @@ class SistemaPDV:
         paned.add(frame_direito, weight=1)
         
         # Carrinho
-        colunas_carrinho = ("Código", "Descrição", "Qtd", "Preço", "Total")
-        self.tree_carrinho = ttk.Treeview(frame_direito, columns=colunas_carrinho, show="headings", height=8)
+        self.tree_carrinho = ttk.Treeview(frame_direito, columns=self.COLUNAS_CARRINHO, show="headings", height=8)
         
-        for col in colunas_carrinho:
-            self.tree_carrinho.heading(col, text=col)
-            self.tree_carrinho.column(col, width=100)
+        self._configurar_colunas(self.tree_carrinho, self.COLUNAS_CARRINHO, (100,) * len(self.COLUNAS_CARRINHO))
         
         self.tree_carrinho.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
         self.tree_carrinho.bind('<Delete>', lambda e: self.remover_do_carrinho())
@@ -290,8 +501,10 @@ class SistemaPDV:
         ttk.Button(frame_finalizar, text="💾 Finalizar Venda", 
                   command=self.finalizar_venda).pack(side=tk.RIGHT, padx=2)
         
-        # Inicializar carrinho
-        self.carrinho = []
+        # Inicializar carrinho (código -> item, com o iid da linha no tree_carrinho)
+        self.carrinho = {}
+        self._carrinho_iids = {}  # iid da linha no tree_carrinho -> código (o Tk converte as células)
+        self._carrinho_subtotal = 0.0  # Mantido a cada alteração do carrinho
         self.atualizar_totais()
     
     def novo_produto(self):
@@ -305,31 +518,15 @@ class SistemaPDV:
             messagebox.showwarning("Seleção", "Selecione um produto para editar!")
             return
         
-        # Obter dados do produto selecionado
-        valores = self.tree_produtos.item(item[0])['values']
-        codigo = valores[0]
+        # Código vem da lista, não da célula (o Tk converte '001' em 1)
+        codigo = self._codigos_produtos[self.tree_produtos.index(item[0])]
         
         # Buscar dados completos do produto
-        conn = sqlite3.connect("dados/produtos_sic.db")
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM produtos WHERE codigo = ?", (codigo,))
-        produto = cursor.fetchone()
-        conn.close()
+        produto = self._produto_por_codigo(codigo)
         
         if produto:
             # Converter para dicionário
-            produto_data = {
-                'codigo': produto[0],
-                'descricao': produto[1],
-                'preco_venda': produto[2],
-                'preco_custo': produto[3],
-                'estoque': produto[4],
-                'categoria': produto[5],
-                'ativo': produto[6],
-                'marca': produto[8] if len(produto) > 8 else '',
-                'unidade': produto[9] if len(produto) > 9 else 'UN',
-                'peso': produto[10] if len(produto) > 10 else 0
-            }
+            produto_data = produto._asdict()
             self.abrir_formulario_produto(produto_data)
         else:
             messagebox.showerror("Erro", "Produto não encontrado!")
@@ -342,7 +539,7 @@ class SistemaPDV:
             return
         
         valores = self.tree_produtos.item(item[0])['values']
-        codigo = valores[0]
+        codigo = self._codigos_produtos[self.tree_produtos.index(item[0])]
         descricao = valores[1]
         
         # Confirmar exclusão
@@ -353,20 +550,75 @@ class SistemaPDV:
         
         if resposta:
             try:
-                conn = sqlite3.connect("dados/produtos_sic.db")
-                cursor = conn.cursor()
-                cursor.execute("DELETE FROM produtos WHERE codigo = ?", (codigo,))
-                conn.commit()
-                conn.close()
+                self._executar_local(self.SQL_EXCLUIR_PRODUTO, (codigo,))
+                self._esquecer_produto(codigo)
                 
-                self.log(f"🗑️ Produto excluído: {codigo}")
+                self.log("🗑️ Produto excluído: %s", codigo)
                 messagebox.showinfo("Sucesso", f"Produto {codigo} excluído com sucesso!")
                 self.listar_produtos()
                 
             except Exception as e:
-                self.log(f"❌ Erro ao excluir produto: {e}")
+                self.log("❌ Erro ao excluir produto: %s", e)
                 messagebox.showerror("Erro", f"Erro ao excluir produto:\n{e}")
     
+    def _mostrar_desfazer(self, mensagem, registro):
+        """Aviso não modal de salvamento com botão Desfazer por 5 segundos"""
+        # Um aviso por vez: o novo substitui o anterior, que não pode mais ser desfeito
+        # (desfazer um salvamento antigo sobrescreveria os mais novos)
+        self._fechar_aviso_desfazer()
+        self._desfazer = registro
+        
+        aviso = tk.Frame(self.root, bg="#2c3e50", padx=10, pady=5)
+        tk.Label(aviso, text=f"✅ {mensagem}", bg="#2c3e50", fg="white").pack(side=tk.LEFT)
+        ttk.Button(aviso, text="↩️ Desfazer", command=self._desfazer_salvamento).pack(side=tk.LEFT, padx=(10, 0))
+        aviso.place(relx=1.0, rely=1.0, x=-10, y=-30, anchor=tk.SE)
+        self._aviso_desfazer = aviso
+        self._aviso_after_id = self.root.after(5000, self._fechar_aviso_desfazer)
+
+    def _fechar_aviso_desfazer(self):
+        """Tirar o aviso da tela e descartar o salvamento pendente"""
+        if self._aviso_after_id:
+            self.root.after_cancel(self._aviso_after_id)
+            self._aviso_after_id = None
+        if self._aviso_desfazer is not None:
+            self._aviso_desfazer.destroy()
+            self._aviso_desfazer = None
+        self._desfazer = None
+
+    def _desfazer_salvamento(self):
+        """Voltar o produto ao estado anterior ao salvamento"""
+        registro = self._desfazer
+        self._fechar_aviso_desfazer()
+        if registro is None:
+            return  # Aviso já expirou
+        
+        codigo, colunas, anterior = registro
+        try:
+            if anterior is None:
+                # Era um cadastro novo
+                self._executar_local(self.SQL_EXCLUIR_PRODUTO, (codigo,))
+            else:
+                self._executar_local(
+                    f"INSERT OR REPLACE INTO produtos ({', '.join(colunas)}) "
+                    f"VALUES ({', '.join('?' * len(colunas))})",
+                    anterior
+                )
+            self._esquecer_produto(codigo)
+            self.log("↩️ Salvamento desfeito: %s", codigo)
+            self.listar_produtos()
+        except Exception as e:
+            self.log("❌ Erro ao desfazer: %s", e)
+            messagebox.showerror("Erro", f"Erro ao desfazer:\n{e}")
+
+    def _campo_formulario(self, frame, row, rotulo, valor=None):
+        """Rótulo + Entry numa linha do formulário; devolve (próxima linha, entry)"""
+        ttk.Label(frame, text=rotulo).grid(row=row, column=0, sticky=tk.W, pady=5)
+        entry = ttk.Entry(frame, width=30)
+        entry.grid(row=row, column=1, padx=(10, 0), pady=5, sticky=tk.W+tk.E)
+        if valor is not None:
+            entry.insert(0, valor)
+        return row + 1, entry
+
     def abrir_formulario_produto(self, produto_data=None):
         """Abrir formulário de cadastro/edição de produto"""
         # Criar janela do formulário
@@ -389,67 +641,39 @@ class SistemaPDV:
                          font=("Arial", 14, "bold"))
         titulo.pack(pady=(0, 20))
         
-        # Campos do formulário
+        # Campos do formulário (valores só na edição)
         row = 0
+        dados = produto_data or {}
         
         # Código do produto (obrigatório)
-        ttk.Label(main_frame, text="*Código do Produto:").grid(row=row, column=0, sticky=tk.W, pady=5)
-        entry_codigo = ttk.Entry(main_frame, width=30)
-        entry_codigo.grid(row=row, column=1, padx=(10, 0), pady=5, sticky=tk.W+tk.E)
+        row, entry_codigo = self._campo_formulario(
+            main_frame, row, "*Código do Produto:", dados.get('codigo', '') if dados else None)
         if produto_data:
-            entry_codigo.insert(0, produto_data.get('codigo', ''))
             entry_codigo.config(state='readonly')  # Não permitir editar código
-        row += 1
         
         # Descrição (obrigatória)
-        ttk.Label(main_frame, text="*Descrição:").grid(row=row, column=0, sticky=tk.W, pady=5)
-        entry_descricao = ttk.Entry(main_frame, width=30)
-        entry_descricao.grid(row=row, column=1, padx=(10, 0), pady=5, sticky=tk.W+tk.E)
-        if produto_data:
-            entry_descricao.insert(0, produto_data.get('descricao', ''))
-        row += 1
+        row, entry_descricao = self._campo_formulario(
+            main_frame, row, "*Descrição:", dados.get('descricao', '') if dados else None)
         
         # Preço de venda (obrigatório)
-        ttk.Label(main_frame, text="*Preço de Venda (R$):").grid(row=row, column=0, sticky=tk.W, pady=5)
-        entry_preco_venda = ttk.Entry(main_frame, width=30)
-        entry_preco_venda.grid(row=row, column=1, padx=(10, 0), pady=5, sticky=tk.W+tk.E)
-        if produto_data:
-            entry_preco_venda.insert(0, str(produto_data.get('preco_venda', '')))
-        row += 1
+        row, entry_preco_venda = self._campo_formulario(
+            main_frame, row, "*Preço de Venda (R$):", str(dados.get('preco_venda', '')) if dados else None)
         
         # Preço de custo (opcional)
-        ttk.Label(main_frame, text="Preço de Custo (R$):").grid(row=row, column=0, sticky=tk.W, pady=5)
-        entry_preco_custo = ttk.Entry(main_frame, width=30)
-        entry_preco_custo.grid(row=row, column=1, padx=(10, 0), pady=5, sticky=tk.W+tk.E)
-        if produto_data:
-            entry_preco_custo.insert(0, str(produto_data.get('preco_custo', '')))
-        row += 1
+        row, entry_preco_custo = self._campo_formulario(
+            main_frame, row, "Preço de Custo (R$):", str(dados.get('preco_custo', '')) if dados else None)
         
         # Estoque inicial
-        ttk.Label(main_frame, text="Estoque:").grid(row=row, column=0, sticky=tk.W, pady=5)
-        entry_estoque = ttk.Entry(main_frame, width=30)
-        entry_estoque.grid(row=row, column=1, padx=(10, 0), pady=5, sticky=tk.W+tk.E)
-        if produto_data:
-            entry_estoque.insert(0, str(produto_data.get('estoque', '0')))
-        else:
-            entry_estoque.insert(0, '0')
-        row += 1
+        row, entry_estoque = self._campo_formulario(
+            main_frame, row, "Estoque:", str(dados.get('estoque', '0')) if dados else '0')
         
         # Categoria
-        ttk.Label(main_frame, text="Categoria:").grid(row=row, column=0, sticky=tk.W, pady=5)
-        entry_categoria = ttk.Entry(main_frame, width=30)
-        entry_categoria.grid(row=row, column=1, padx=(10, 0), pady=5, sticky=tk.W+tk.E)
-        if produto_data:
-            entry_categoria.insert(0, produto_data.get('categoria', ''))
-        row += 1
+        row, entry_categoria = self._campo_formulario(
+            main_frame, row, "Categoria:", dados.get('categoria', '') if dados else None)
         
         # Marca
-        ttk.Label(main_frame, text="Marca:").grid(row=row, column=0, sticky=tk.W, pady=5)
-        entry_marca = ttk.Entry(main_frame, width=30)
-        entry_marca.grid(row=row, column=1, padx=(10, 0), pady=5, sticky=tk.W+tk.E)
-        if produto_data:
-            entry_marca.insert(0, produto_data.get('marca', ''))
-        row += 1
+        row, entry_marca = self._campo_formulario(
+            main_frame, row, "Marca:", dados.get('marca', '') if dados else None)
         
         # Unidade
         ttk.Label(main_frame, text="Unidade:").grid(row=row, column=0, sticky=tk.W, pady=5)
@@ -462,12 +686,8 @@ class SistemaPDV:
         row += 1
         
         # Peso
-        ttk.Label(main_frame, text="Peso (KG):").grid(row=row, column=0, sticky=tk.W, pady=5)
-        entry_peso = ttk.Entry(main_frame, width=30)
-        entry_peso.grid(row=row, column=1, padx=(10, 0), pady=5, sticky=tk.W+tk.E)
-        if produto_data:
-            entry_peso.insert(0, str(produto_data.get('peso', '')))
-        row += 1
+        row, entry_peso = self._campo_formulario(
+            main_frame, row, "Peso (KG):", str(dados.get('peso', '')) if dados else None)
         
         # Status ativo
         var_ativo = tk.BooleanVar(value=True)
@@ -536,110 +756,59 @@ class SistemaPDV:
                     if not messagebox.askokcancel("Avisos Encontrados", warning_message + "\n\nDeseja continuar mesmo assim?"):
                         return
                 
-                # Mostrar diálogo de confirmação
+                # Sem confirmação: o salvamento pode ser desfeito por alguns segundos
                 codigo = produto_data['codigo']
-                descricao = produto_data['descricao']
-                preco_display = self.product_validator.format_price_display(produto_data['preco_venda'])
-                
-                action = "editado" if produto_data else "cadastrado"
-                confirm_message = f"Confirmar {action.split()[0]}?\n\n"
-                confirm_message += f"Código: {codigo}\n"
-                confirm_message += f"Descrição: {descricao}\n"
-                confirm_message += f"Preço: {preco_display}"
                 
-                if not messagebox.askokcancel("Confirmar Operação", confirm_message):
-                    return
+                # Converter tipos
+                preco_venda_float = float(produto_data['preco_venda'].replace(',', '.'))
+                preco_custo_float = float(produto_data['preco_custo'].replace(',', '.')) if produto_data['preco_custo'] else 0
+                estoque_int = int(produto_data['estoque'])
+                peso_float = float(produto_data['peso'].replace(',', '.')) if produto_data['peso'] else 0
                 
-                # Mostrar indicador de carregamento
-                progress_window = tk.Toplevel(janela)
-                progress_window.title("Salvando...")
-                progress_window.geometry("300x100")
-                progress_window.transient(janela)
-                progress_window.grab_set()
-                
-                # Centralizar janela de progresso
-                progress_window.update_idletasks()
-                x = (progress_window.winfo_screenwidth() // 2) - (progress_window.winfo_width() // 2)
-                y = (progress_window.winfo_screenheight() // 2) - (progress_window.winfo_height() // 2)
-                progress_window.geometry(f"+{x}+{y}")
-                
-                progress_label = tk.Label(progress_window, text="Salvando produto...", font=("Arial", 12))
-                progress_label.pack(pady=20)
-                
-                progress_bar = ttk.Progressbar(progress_window, mode='indeterminate')
-                progress_bar.pack(pady=10, padx=20, fill=tk.X)
-                progress_bar.start()
+                # Salvar direto na thread da interface: é uma linha só no SQLite local
+                with self._transacao_local() as cursor:
+                    # Guardar a linha como estava (None = produto novo) para desfazer
+                    cursor.execute("SELECT * FROM produtos WHERE codigo = ?", (codigo,))
+                    registro = (codigo, [d[0] for d in cursor.description], cursor.fetchone())
+                    
+                    if produto_data:  # Editar
+                        cursor.execute('''
+                            UPDATE produtos SET
+                                descricao = ?, preco_venda = ?, preco_custo = ?, estoque = ?,
+                                categoria = ?, marca = ?, unidade = ?, peso = ?, ativo = ?,
+                                ultima_atualizacao = CURRENT_TIMESTAMP, atualizado_em = CURRENT_TIMESTAMP
+                            WHERE codigo = ?
+                        ''', (
+                            produto_data['descricao'], preco_venda_float, preco_custo_float,
+                            estoque_int, produto_data['categoria'], produto_data['marca'],
+                            produto_data['unidade'], peso_float, produto_data['ativo'],
+                            codigo
+                        ))
+                        self.log("✏️ Produto editado: %s", codigo)
+                        message = f"Produto {codigo} editado com sucesso!"
+                    else:  # Novo
+                        cursor.execute('''
+                            INSERT INTO produtos (
+                                codigo, descricao, preco_venda, preco_custo, estoque,
+                                categoria, marca, unidade, peso, ativo
+                            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                        ''', (
+                            codigo, produto_data['descricao'], preco_venda_float,
+                            preco_custo_float, estoque_int, produto_data['categoria'],
+                            produto_data['marca'], produto_data['unidade'], peso_float, produto_data['ativo']
+                        ))
+                        self.log("➕ Produto cadastrado: %s", codigo)
+                        message = f"Produto {codigo} cadastrado com sucesso!"
                 
-                # Função para salvar em thread separada
-                def salvar_em_thread():
-                    try:
-                        # Converter tipos
-                        preco_venda_float = float(produto_data['preco_venda'].replace(',', '.'))
-                        preco_custo_float = float(produto_data['preco_custo'].replace(',', '.')) if produto_data['preco_custo'] else 0
-                        estoque_int = int(produto_data['estoque'])
-                        peso_float = float(produto_data['peso'].replace(',', '.')) if produto_data['peso'] else 0
-                        
-                        # Salvar no banco
-                        conn = sqlite3.connect("dados/produtos_sic.db")
-                        cursor = conn.cursor()
-                        
-                        if produto_data:  # Editar
-                            cursor.execute('''
-                                UPDATE produtos SET
-                                    descricao = ?, preco_venda = ?, preco_custo = ?, estoque = ?,
-                                    categoria = ?, marca = ?, unidade = ?, peso = ?, ativo = ?,
-                                    ultima_atualizacao = CURRENT_TIMESTAMP, atualizado_em = CURRENT_TIMESTAMP
-                                WHERE codigo = ?
-                            ''', (
-                                produto_data['descricao'], preco_venda_float, preco_custo_float,
-                                estoque_int, produto_data['categoria'], produto_data['marca'],
-                                produto_data['unidade'], peso_float, produto_data['ativo'],
-                                codigo
-                            ))
-                            self.log(f"✏️ Produto editado: {codigo}")
-                            message = f"Produto {codigo} editado com sucesso!"
-                        else:  # Novo
-                            cursor.execute('''
-                                INSERT INTO produtos (
-                                    codigo, descricao, preco_venda, preco_custo, estoque,
-                                    categoria, marca, unidade, peso, ativo
-                                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                            ''', (
-                                codigo, produto_data['descricao'], preco_venda_float,
-                                preco_custo_float, estoque_int, produto_data['categoria'],
-                                produto_data['marca'], produto_data['unidade'], peso_float, produto_data['ativo']
-                            ))
-                            self.log(f"➕ Produto cadastrado: {codigo}")
-                            message = f"Produto {codigo} cadastrado com sucesso!"
-                        
-                        conn.commit()
-                        conn.close()
-                        
-                        # Simular tempo de processamento para mostrar progress
-                        time.sleep(0.5)
-                        
-                        # Fechar janela de progresso e mostrar sucesso
-                        self.root.after(0, lambda: [
-                            progress_window.destroy(),
-                            messagebox.showinfo("Sucesso", message),
-                            self.listar_produtos(),
-                            janela.destroy()
-                        ])
-                        
-                    except Exception as e:
-                        # Fechar janela de progresso e mostrar erro
-                        error_msg = f"Erro ao salvar produto:\n{e}"
-                        self.root.after(0, lambda: [
-                            progress_window.destroy(),
-                            messagebox.showerror("Erro", error_msg)
-                        ])
-                        self.log(f"❌ Erro ao salvar produto: {e}")
+                self._esquecer_produto(codigo)
                 
-                # Executar salvamento em thread
-                threading.Thread(target=salvar_em_thread, daemon=True).start()
+                # Avisar sem bloquear (com opção de desfazer)
+                self.listar_produtos()
+                janela.destroy()
+                self._mostrar_desfazer(message, registro)
                 
             except Exception as e:
-                self.log(f"❌ Erro ao salvar produto: {e}")
+                self.log("❌ Erro ao salvar produto: %s", e)
                 messagebox.showerror("Erro", f"Erro ao salvar produto:\n{e}")
         
         # Botões
@@ -660,14 +829,11 @@ class SistemaPDV:
             return
         
         # Limpar lista
-        for item in self.tree_produtos_pdv.get_children():
-            self.tree_produtos_pdv.delete(item)
+        self._limpar_tree(self.tree_produtos_pdv)
+        self._pdv_linhas = []
         
         try:
-            conn = sqlite3.connect("dados/produtos_sic.db")
-            cursor = conn.cursor()
-            
-            cursor.execute("""
+            produtos = self._consultar_local("""
                 SELECT codigo, descricao, preco_venda, estoque
                 FROM produtos 
                 WHERE (codigo LIKE ? OR descricao LIKE ?) AND ativo = 1
@@ -675,20 +841,14 @@ class SistemaPDV:
                 LIMIT 50
             """, (f"%{termo}%", f"%{termo}%"))
             
-            produtos = cursor.fetchall()
-            conn.close()
-            
-            for produto in produtos:
-                codigo, descricao, preco, estoque = produto
-                self.tree_produtos_pdv.insert("", tk.END, values=(
-                    codigo,
-                    descricao[:40],
-                    f"R$ {preco:.2f}",
-                    estoque
-                ))
+            self._pdv_linhas = [(codigo, preco) for codigo, _, preco, _ in produtos]
+            self._inserir_linhas(self.tree_produtos_pdv, (
+                (codigo, descricao[:40], f"R$ {preco:.2f}", estoque)
+                for codigo, descricao, preco, estoque in produtos
+            ))
                 
         except Exception as e:
-            self.log(f"❌ Erro buscar produto PDV: {e}")
+            self.log("❌ Erro buscar produto PDV: %s", e)
     
     def adicionar_ao_carrinho(self):
         """Adicionar produto selecionado ao carrinho"""
@@ -698,9 +858,9 @@ class SistemaPDV:
             return
         
         valores = self.tree_produtos_pdv.item(item[0])['values']
-        codigo = valores[0]
         descricao = valores[1]
-        preco_str = valores[2].replace('R$ ', '').replace(',', '.')
+        # Código e preço vêm do banco, não das células (o Tk converte '001' em 1)
+        codigo, preco = self._pdv_linhas[self.tree_produtos_pdv.index(item[0])]
         estoque = int(valores[3])
         
         if estoque <= 0:
@@ -715,47 +875,43 @@ class SistemaPDV:
         )
         
         if quantidade:
-            preco = float(preco_str)
             total = quantidade * preco
             
-            # Verificar se produto já está no carrinho
-            for item_carrinho in self.tree_carrinho.get_children():
-                if self.tree_carrinho.item(item_carrinho)['values'][0] == codigo:
-                    # Atualizar quantidade
-                    valores_existentes = self.tree_carrinho.item(item_carrinho)['values']
-                    nova_qtd = int(valores_existentes[2]) + quantidade
-                    novo_total = nova_qtd * preco
-                    
-                    self.tree_carrinho.item(item_carrinho, values=(
-                        codigo, descricao, nova_qtd, f"R$ {preco:.2f}", f"R$ {novo_total:.2f}"
-                    ))
-                    
-                    # Atualizar lista de carrinho interna
-                    for item_interno in self.carrinho:
-                        if item_interno['codigo'] == codigo:
-                            item_interno['quantidade'] = nova_qtd
-                            item_interno['total'] = novo_total
-                            break
-                    
-                    self.atualizar_totais()
-                    return
+            # Produto já no carrinho: somar quantidade na mesma linha
+            item_carrinho = self.carrinho.get(codigo)
+            if item_carrinho:
+                nova_qtd = item_carrinho['quantidade'] + quantidade
+                novo_total = nova_qtd * preco
+                
+                self.tree_carrinho.item(item_carrinho['iid'], values=(
+                    codigo, descricao, nova_qtd, f"R$ {preco:.2f}", f"R$ {novo_total:.2f}"
+                ))
+                self._carrinho_subtotal += novo_total - item_carrinho['total']
+                item_carrinho['quantidade'] = nova_qtd
+                item_carrinho['total'] = novo_total
+                
+                self.atualizar_totais()
+                return
             
             # Adicionar novo item
-            self.tree_carrinho.insert("", tk.END, values=(
+            iid = self.tree_carrinho.insert("", tk.END, values=(
                 codigo, descricao, quantidade, f"R$ {preco:.2f}", f"R$ {total:.2f}"
             ))
             
-            # Adicionar à lista interna
-            self.carrinho.append({
+            # Adicionar ao carrinho interno
+            self.carrinho[codigo] = {
                 'codigo': codigo,
                 'descricao': descricao,
                 'quantidade': quantidade,
                 'preco': preco,
-                'total': total
-            })
+                'total': total,
+                'iid': iid
+            }
+            self._carrinho_iids[iid] = codigo
+            self._carrinho_subtotal += total
             
             self.atualizar_totais()
-            self.log(f"🛒 Adicionado ao carrinho: {codigo} x{quantidade}")
+            self.log("🛒 Adicionado ao carrinho: %s x%s", codigo, quantidade)
     
     def remover_do_carrinho(self):
         """Remover item selecionado do carrinho"""
@@ -764,33 +920,38 @@ class SistemaPDV:
             messagebox.showwarning("Seleção", "Selecione um item para remover!")
             return
         
-        valores = self.tree_carrinho.item(item[0])['values']
-        codigo = valores[0]
+        # Código pela linha selecionada, não pela célula ('001' voltaria como 1)
+        codigo = self._carrinho_iids.pop(item[0], None)
         
         # Remover da treeview
         self.tree_carrinho.delete(item[0])
         
-        # Remover da lista interna
-        self.carrinho = [item for item in self.carrinho if item['codigo'] != codigo]
+        # Remover do carrinho interno
+        removido = self.carrinho.pop(codigo, None)
+        if removido:
+            self._carrinho_subtotal -= removido['total']
+        if not self.carrinho:
+            self._carrinho_subtotal = 0.0  # Sem resíduo de arredondamento
         
         self.atualizar_totais()
-        self.log(f"🗑️ Removido do carrinho: {codigo}")
+        self.log("🗑️ Removido do carrinho: %s", codigo)
     
     def limpar_carrinho(self):
         """Limpar todo o carrinho"""
         if self.carrinho and messagebox.askyesno("Confirmar", "Limpar todo o carrinho?"):
             # Limpar treeview
-            for item in self.tree_carrinho.get_children():
-                self.tree_carrinho.delete(item)
+            self._limpar_tree(self.tree_carrinho)
             
-            # Limpar lista interna
-            self.carrinho = []
+            # Limpar carrinho interno
+            self.carrinho.clear()
+            self._carrinho_iids.clear()
+            self._carrinho_subtotal = 0.0
             self.atualizar_totais()
             self.log("🗑️ Carrinho limpo")
     
     def atualizar_totais(self):
         """Atualizar totais do carrinho"""
-        subtotal = sum(item['total'] for item in self.carrinho)
+        subtotal = self._carrinho_subtotal
         
         self.label_subtotal.config(text=f"Subtotal: R$ {subtotal:.2f}")
         self.label_total.config(text=f"TOTAL: R$ {subtotal:.2f}")
@@ -805,13 +966,14 @@ class SistemaPDV:
             cliente_nome = self.entry_cliente_nome.get().strip() or "Cliente"
             
             # Criar comprovante
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            agora = datetime.now()
+            timestamp = agora.strftime("%Y%m%d_%H%M%S")
             arquivo = f"relatorios/comprovante_{timestamp}.txt"
             os.makedirs("relatorios", exist_ok=True)
             
-            subtotal = sum(item['total'] for item in self.carrinho)
+            subtotal = self._carrinho_subtotal
             
-            conteudo = f"""
+            partes = [f"""
 {'='*60}
            MADEIREIRA MARIA LUIZA
         Rua das Madeiras, 456 - Sua Cidade - SP
@@ -820,37 +982,39 @@ class SistemaPDV:
 
               COMPROVANTE DE VENDA
 
-Nº: {timestamp[-6:]}        Data: {datetime.now().strftime('%d/%m/%Y %H:%M')}
+Nº: {timestamp[-6:]}        Data: {agora.strftime('%d/%m/%Y %H:%M')}
 Cliente: {cliente_nome}
 
 {'='*60}
 Cód. | Descrição                    | Qtd | Preço  | Total
 {'='*60}
-"""
+"""]
             
-            for item in self.carrinho:
-                linha = f"{item['codigo']:<5}| {item['descricao'][:25]:<25}| {item['quantidade']:>3} | {item['preco']:>6.2f} | {item['total']:>6.2f}\n"
-                conteudo += linha
+            partes.extend(
+                f"{item['codigo']:<5}| {item['descricao'][:25]:<25}| {item['quantidade']:>3} | {item['preco']:>6.2f} | {item['total']:>6.2f}\n"
+                for item in self.carrinho.values()
+            )
             
-            conteudo += f"""
+            partes.append(f"""
 {'='*60}
                               TOTAL: R$ {subtotal:.2f}
 {'='*60}
     Obrigado pela preferência! Volte sempre!
            MADEIREIRA MARIA LUIZA
 {'='*60}
-"""
+""")
+            conteudo = ''.join(partes)
             
             with open(arquivo, 'w', encoding='utf-8') as f:
                 f.write(conteudo)
             
-            self.log(f"🧾 Comprovante gerado: {arquivo}")
+            self.log("🧾 Comprovante gerado: %s", arquivo)
             
             if messagebox.askyesno("Comprovante Gerado", f"Comprovante criado!\n\n📄 {arquivo}\n\nAbrir para impressão?"):
-                os.startfile(arquivo)
+                self._abrir_externo(arquivo)
                 
         except Exception as e:
-            self.log(f"❌ Erro gerar comprovante: {e}")
+            self.log("❌ Erro gerar comprovante: %s", e)
             messagebox.showerror("Erro", f"Erro ao gerar comprovante:\n{e}")
     
     def finalizar_venda(self):
@@ -860,25 +1024,22 @@ Cód. | Descrição                    | Qtd | Preço  | Total
             return
         
         # Confirmar venda
-        subtotal = sum(item['total'] for item in self.carrinho)
+        subtotal = self._carrinho_subtotal
         if not messagebox.askyesno("Finalizar Venda", f"Finalizar venda no valor de R$ {subtotal:.2f}?"):
             return
         
         try:
-            conn = sqlite3.connect("dados/produtos_sic.db")
-            cursor = conn.cursor()
-            
-            # Atualizar estoque de cada produto
-            for item in self.carrinho:
-                cursor.execute('''
+            # Atualizar estoque de todos os itens: um statement, uma transação
+            with self._transacao_local() as cursor:
+                cursor.executemany('''
                     UPDATE produtos SET 
                         estoque = estoque - ?,
                         ultima_atualizacao = CURRENT_TIMESTAMP 
                     WHERE codigo = ?
-                ''', (item['quantidade'], item['codigo']))
+                ''', [(item['quantidade'], codigo) for codigo, item in self.carrinho.items()])
             
-            conn.commit()
-            conn.close()
+            for codigo in self.carrinho:
+                self._esquecer_produto(codigo)
             
             # Gerar comprovante
             self.gerar_comprovante_venda()
@@ -889,14 +1050,14 @@ Cód. | Descrição                    | Qtd | Preço  | Total
             # Limpar cliente
             self.entry_cliente_nome.delete(0, tk.END)
             
-            self.log(f"💰 Venda finalizada: R$ {subtotal:.2f}")
+            self.log("💰 Venda finalizada: R$ %.2f", subtotal)
             messagebox.showinfo("Venda Finalizada", f"Venda de R$ {subtotal:.2f} finalizada com sucesso!")
             
             # Atualizar lista de produtos
             self.listar_produtos()
             
         except Exception as e:
-            self.log(f"❌ Erro finalizar venda: {e}")
+            self.log("❌ Erro finalizar venda: %s", e)
             messagebox.showerror("Erro", f"Erro ao finalizar venda:\n{e}")
     
     def fazer_backup_manual(self):
@@ -905,14 +1066,12 @@ Cód. | Descrição                    | Qtd | Preço  | Total
             self.fazer_backup()
             messagebox.showinfo("Backup", "Backup realizado com sucesso!")
         except Exception as e:
-            self.log(f"❌ Erro backup manual: {e}")
+            self.log("❌ Erro backup manual: %s", e)
             messagebox.showerror("Erro", f"Erro ao fazer backup:\n{e}")
     
     def fazer_backup(self):
         """Fazer backup do banco de dados"""
         try:
-            import shutil
-            
             # Criar pasta de backups
             backup_dir = "backups"
             os.makedirs(backup_dir, exist_ok=True)
@@ -921,24 +1080,41 @@ Cód. | Descrição                    | Qtd | Preço  | Total
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             backup_file = f"{backup_dir}/backup_produtos_{timestamp}.db"
             
-            # Copiar banco de dados
+            # Copiar banco de dados pela API de backup do SQLite (cópia consistente mesmo em WAL)
             if os.path.exists("dados/produtos_sic.db"):
-                shutil.copy2("dados/produtos_sic.db", backup_file)
+                origem = sqlite3.connect("dados/produtos_sic.db")
+                destino = sqlite3.connect(backup_file)
+                try:
+                    origem.backup(destino, pages=1000)
+                finally:
+                    destino.close()
+                    origem.close()
                 
                 # Também criar backup em formato SQL
                 sql_backup = f"{backup_dir}/backup_produtos_{timestamp}.sql"
                 self.exportar_backup_sql(sql_backup)
                 
-                self.log(f"💾 Backup criado: {backup_file}")
+                self.log("💾 Backup criado: %s", backup_file)
                 return True
             else:
                 self.log("❌ Banco de dados não encontrado para backup")
                 return False
                 
         except Exception as e:
-            self.log(f"❌ Erro fazer backup: {e}")
+            self.log("❌ Erro fazer backup: %s", e)
             raise
     
+    def _backup_em_background(self, mensagem="💾 Backup automático concluído"):
+        """Rodar fazer_backup numa thread, sem travar a interface"""
+        def executar():
+            try:
+                if self.fazer_backup():
+                    self._status_async(mensagem)
+            except Exception:
+                pass  # fazer_backup já registrou o erro no log
+        
+        threading.Thread(target=executar, daemon=True).start()
+    
     def exportar_backup_sql(self, arquivo_sql):
         """Exportar backup em formato SQL"""
         try:
@@ -954,20 +1130,20 @@ Cód. | Descrição                    | Qtd | Preço  | Total
                     f.write(f"{linha}\n")
             
             conn.close()
-            self.log(f"💾 Backup SQL criado: {arquivo_sql}")
+            self.log("💾 Backup SQL criado: %s", arquivo_sql)
             
         except Exception as e:
-            self.log(f"❌ Erro backup SQL: {e}")
+            self.log("❌ Erro backup SQL: %s", e)
     
     def abrir_pasta_backups(self):
         """Abrir pasta de backups"""
         try:
             backup_dir = os.path.abspath("backups")
             os.makedirs(backup_dir, exist_ok=True)
-            os.startfile(backup_dir)
+            self._abrir_externo(backup_dir)
             self.log("📂 Pasta backups aberta")
         except Exception as e:
-            self.log(f"❌ Erro abrir pasta backups: {e}")
+            self.log("❌ Erro abrir pasta backups: %s", e)
     
     def verificar_backup_automatico(self):
         """Verificar se deve fazer backup automático"""
@@ -979,41 +1155,35 @@ Cód. | Descrição                    | Qtd | Preço  | Total
             backup_dir = "backups"
             if not os.path.exists(backup_dir):
                 # Primeiro backup
-                self.fazer_backup()
+                self._backup_em_background()
                 return
             
-            # Encontrar último backup
-            backups = [f for f in os.listdir(backup_dir) if f.startswith("backup_produtos_") and f.endswith(".db")]
-            if not backups:
-                # Nenhum backup encontrado
-                self.fazer_backup()
-                return
-            
-            # Verificar data do último backup
-            ultimo_backup = max(backups)
-            backup_path = os.path.join(backup_dir, ultimo_backup)
-            backup_time = os.path.getmtime(backup_path)
-            agora = time.time()
+            # Data do último backup numa passada só (DirEntry já traz o stat)
+            backup_time = 0.0
+            with os.scandir(backup_dir) as entradas:
+                for entrada in entradas:
+                    nome = entrada.name
+                    if nome.startswith("backup_produtos_") and nome.endswith(".db"):
+                        backup_time = max(backup_time, entrada.stat().st_mtime)
             
-            # Fazer backup se o último foi há mais de 24 horas
-            if (agora - backup_time) > (24 * 60 * 60):
-                self.fazer_backup()
+            # Fazer backup se não houver nenhum ou se o último foi há mais de 24 horas
+            if (time.time() - backup_time) > (24 * 60 * 60):
+                self._backup_em_background()
                 
         except Exception as e:
-            self.log(f"❌ Erro verificar backup automático: {e}")
+            self.log("❌ Erro verificar backup automático: %s", e)
     
     def inicializar_sistema_backup(self):
         """Inicializar sistema de backup automático"""
-        def verificar_periodicamente():
-            while True:
-                try:
-                    self.verificar_backup_automatico()
-                except:
-                    pass
-                time.sleep(3600)  # Verificar a cada hora
-        
-        thread = threading.Thread(target=verificar_periodicamente, daemon=True)
-        thread.start()
+        # A abertura já faz o backup inicial; a próxima verificação é daqui a uma hora
+        self._backup_after_id = self.root.after(3600000, self._backup_tick)
+    
+    def _backup_tick(self):
+        """Verificação de backup de hora em hora (thread do Tk)"""
+        try:
+            self.verificar_backup_automatico()
+        finally:
+            self._backup_after_id = self.root.after(3600000, self._backup_tick)
     
     def criar_aba_relatorios(self):
         """Aba para relatórios"""
@@ -1224,99 +1394,151 @@ Cód. | Descrição                    | Qtd | Preço  | Total
         try:
             os.makedirs("dados", exist_ok=True)
             
-            conn = sqlite3.connect("dados/produtos_sic.db")
-            cursor = conn.cursor()
+            # Conexão única reaproveitada por todas as consultas locais
+            self.conn_local = sqlite3.connect(
+                "dados/produtos_sic.db", check_same_thread=False, isolation_level=None,
+                cached_statements=256
+            )
+            # page_size só vale para banco novo (antes do WAL e das tabelas); nos demais é ignorado
+            self.conn_local.executescript("""
+                PRAGMA page_size=8192;
+                PRAGMA journal_mode=WAL;
+                PRAGMA synchronous=NORMAL;
+                PRAGMA temp_store=MEMORY;
+                PRAGMA cache_size=-131072;
+                PRAGMA mmap_size=268435456;
+                PRAGMA case_sensitive_like=OFF;
+            """)
             
-            # Tabela produtos
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS produtos (
-                    codigo TEXT PRIMARY KEY,
-                    descricao TEXT,
-                    preco_venda REAL,
-                    preco_custo REAL,
-                    estoque INTEGER,
-                    categoria TEXT,
-                    ativo INTEGER DEFAULT 1,
-                    ultima_atualizacao TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
-            
-            # Tabela cache info
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS cache_info (
-                    tipo TEXT PRIMARY KEY,
-                    ultimo_update TIMESTAMP,
-                    total_registros INTEGER
-                )
-            ''')
+            # WAL pode ser recusado (ex.: banco em pasta de rede); sem ele a leitura espera a gravação
+            modo = self.conn_local.execute("PRAGMA journal_mode").fetchone()[0]
+            if modo != "wal":
+                self.log("⚠️ Banco local sem WAL (modo %s): consultas podem aguardar gravações", modo)
+            
+            # Esquema só é (re)aplicado quando a versão gravada no banco é antiga
+            versao = self.conn_local.execute("PRAGMA user_version").fetchone()[0]
+            if versao < self.SCHEMA_VERSION:
+                self.conn_local.executescript(self.DDL_BANCO_LOCAL)
             
-            conn.commit()
-            conn.close()
+            # Busca por código: colunas extras quando o banco as tiver, senão os padrões
+            colunas = {linha[1] for linha in self.conn_local.execute("PRAGMA table_info(produtos)")}
+            if {"marca", "unidade", "peso"} <= colunas:
+                extras = "marca, unidade, peso"
+            else:
+                extras = "'' AS marca, 'UN' AS unidade, 0 AS peso"
+            self._sql_produto_por_codigo = self.SQL_PRODUTO_POR_CODIGO.format(extras=extras)
+            
+            # Preparar as consultas quentes uma vez; depois saem do cache de statements
+            for sql in (self.SQL_LISTAR_PRODUTOS, self.SQL_RESUMO_ESTOQUE, self.SQL_ANALISE_PRECOS):
+                self.conn_local.execute(sql).close()
             
             self.log("✅ Banco local criado/verificado")
             
         except Exception as e:
-            self.log(f"❌ Erro criar banco local: {e}")
+            self.log("❌ Erro criar banco local: %s", e)
 
     def verificar_sic_periodicamente(self):
         """Verificar status SIC em background com timeout de sessão"""
-        def verificar():
-            while True:
-                try:
-                    # Verificar timeout de sessão
-                    if self.conectado_sic and self.check_session_timeout():
-                        self.log("⏰ Sessão SIC expirou por timeout")
-                        self.desconectar_sic()
-                    
-                    sic_livre = self.detectar_sic_livre()
-                    
-                    if sic_livre:
-                        self.label_sic_status.config(
-                            text="🟢 SIC: Livre (pode sincronizar)",
-                            foreground="green"
-                        )
-                        
-                        # Auto-sync se habilitado
-                        if self.var_auto_sync.get() and not self.conectado_sic:
-                            self.auto_sincronizar()
-                    else:
-                        self.label_sic_status.config(
-                            text="🟡 SIC: Em uso (modo offline)",
-                            foreground="orange"
-                        )
-                        
-                except Exception as e:
-                    self.label_sic_status.config(
-                        text="🔴 SIC: Erro verificação",
-                        foreground="red"
-                    )
-                
-                time.sleep(30)  # Verificar a cada 30 segundos
-        
-        thread = threading.Thread(target=verificar, daemon=True)
-        thread.start()
+        # O intervalo é contado pelo Tk; só a sonda roda numa thread curta
+        self._sic_after_id = None
+        if not self._stop_event.is_set():
+            threading.Thread(target=self._verificar_sic_worker, daemon=True).start()
+
+    def _verificar_sic_worker(self):
+        """Sondar o SIC (thread de background) e devolver o resultado ao Tk"""
+        try:
+            sessao_expirada = self.conectado_sic and self.check_session_timeout()
+            sic_livre = self.detectar_sic_livre()
+        except Exception:
+            sessao_expirada, sic_livre = False, None
+        
+        try:
+            self.root.after(0, self._aplicar_status_sic, sic_livre, sessao_expirada)
+        except (RuntimeError, tk.TclError):
+            pass  # Janela já destruída
+
+    def _aplicar_status_sic(self, sic_livre, sessao_expirada):
+        """Atualizar status SIC na interface (executado na thread do Tk)"""
+        # Próxima verificação em 30 segundos, contados a partir desta
+        if not self._stop_event.is_set():
+            self._sic_after_id = self.root.after(30000, self.verificar_sic_periodicamente)
+        
+        # Verificar timeout de sessão
+        if sessao_expirada:
+            self.log("⏰ Sessão SIC expirou por timeout")
+            self.desconectar_sic()
+        
+        if sic_livre is None:
+            self.label_sic_status.config(
+                text="🔴 SIC: Erro verificação",
+                foreground="red"
+            )
+        elif sic_livre:
+            self.label_sic_status.config(
+                text="🟢 SIC: Livre (pode sincronizar)",
+                foreground="green"
+            )
+            
+            # Auto-sync se habilitado
+            if self.var_auto_sync.get() and not self.conectado_sic:
+                self.auto_sincronizar()
+        else:
+            self.label_sic_status.config(
+                text="🟡 SIC: Em uso (modo offline)",
+                foreground="orange"
+            )
 
     def detectar_sic_livre(self):
         """Detectar se SIC está livre para conexão"""
+        with self._probe_lock:
+            try:
+                if self._probe_conn is None:
+                    # Tentar conexão rápida (só quando não há sonda aberta)
+                    pyodbc = self._importar_modulo("pyodbc")
+                    
+                    if self._sic_conn_str is None:
+                        self._sic_conn_str = (
+                            f"{self._driver_sic()}"
+                            f"SERVER={self.servidor_sql};"
+                            f"DATABASE={self.database_sic};"
+                            f"UID={self.usuario_sql};"
+                            f"PWD={self.senha_sql};"
+                            f"Timeout=2;"
+                        )
+                    
+                    self._probe_conn = pyodbc.connect(self._sic_conn_str)
+                    self._probe_conn.timeout = 2
+                
+                # Consulta trivial na conexão já aberta, sem novo handshake
+                self._probe_conn.execute("SELECT 1").fetchone()
+                return True
+                
+            except:
+                self._fechar_sonda_sic()
+                return False
+
+    def _driver_sic(self):
+        """Trecho DRIVER da string de conexão (driver detectado uma única vez)"""
+        if self._driver is None:
+            instalados = self._importar_modulo("pyodbc").drivers()
+            self._driver = next((d for d in self.DRIVERS_SIC if d in instalados), "SQL Server")
+        
+        trecho = f"DRIVER={{{self._driver}}};"
+        if self._driver != "SQL Server":
+            # MARS: sonda e cursor de dados podem dividir a mesma conexão
+            trecho += "MARS_Connection=yes;"
+        if self._driver == "ODBC Driver 18 for SQL Server":
+            trecho += "Encrypt=optional;"  # Driver 18 exige criptografia por padrão
+        return trecho
+
+    def _fechar_sonda_sic(self):
+        """Fechar conexão de sonda; a próxima verificação reconecta"""
         try:
-            # Tentar conexão rápida
-            import pyodbc
-            
-            conn_string = (
-                f"DRIVER={{SQL Server}};"
-                f"SERVER={self.servidor_sql};"
-                f"DATABASE={self.database_sic};"
-                f"UID={self.usuario_sql};"
-                f"PWD={self.senha_sql};"
-                f"Timeout=2;"
-            )
-            
-            conn = pyodbc.connect(conn_string)
-            conn.close()
-            return True
-            
+            if self._probe_conn is not None:
+                self._probe_conn.close()
         except:
-            return False
+            pass
+        self._probe_conn = None
 
     def tentar_sync_rapido(self):
         """Tentar sincronização rápida"""
@@ -1333,41 +1555,93 @@ Cód. | Descrição                    | Qtd | Preço  | Total
         self.sincronizar_dados_sic()
 
     def sincronizar_dados_sic(self):
-        """Sincronizar dados do SIC"""
+        """Sincronizar dados do SIC em background, sem travar a interface"""
+        if self._sync_em_andamento:
+            return  # Sincronização já em andamento
+        
+        self._sync_em_andamento = True
+        self.status_var.set("🔄 Conectando ao SIC...")
+        if self._sync_thread is None:
+            self._sync_thread = threading.Thread(target=self._sync_loop, daemon=True)
+            self._sync_thread.start()
+        self._sync_fila.put(self._sync_worker)
+
+    def _sync_loop(self):
+        """Atender os pedidos de sincronização na mesma thread (até receber None)"""
+        while True:
+            tarefa = self._sync_fila.get()
+            if tarefa is None:
+                break
+            try:
+                tarefa()
+            finally:
+                self._sync_em_andamento = False
+
+    def _sync_worker(self):
+        """Conectar, buscar e salvar produtos do SIC (thread de background)"""
         try:
-            self.status_var.set("🔄 Conectando ao SIC...")
-            self.root.update()
-            
             # Conectar SIC
-            if self.conectar_sic():
-                self.status_var.set("📊 Sincronizando produtos...")
-                self.root.update()
-                
-                # Buscar produtos
-                produtos = self.buscar_produtos_sic()
-                
-                if produtos:
-                    # Salvar no banco local
-                    self.salvar_produtos_local(produtos)
-                    
-                    # Atualizar lista
-                    self.listar_produtos()
-                    
-                    self.status_var.set(f"✅ Sincronizado! {len(produtos)} produtos")
-                    self.log(f"✅ Sincronização concluída: {len(produtos)} produtos")
-                else:
-                    self.status_var.set("⚠️ Nenhum produto encontrado")
-                
-                # Desconectar
-                self.desconectar_sic()
+            if not self.conectar_sic():
+                self._status_async("❌ Erro na conexão SIC")
+                return
+            
+            self._status_async("📊 Sincronizando produtos...")
+            
+            # Buscar e salvar produtos em lotes, sem carregar tudo na memória.
+            # Conexão própria da thread: a da interface segue livre para leitura
+            conn = self._conectar_banco(isolation_level=None)
+            try:
+                total = self.salvar_produtos_local(self.buscar_produtos_sic(), conn)
+            finally:
+                conn.close()
+            
+            if total:
+                self.root.after(0, self._sync_done, total)
             else:
-                self.status_var.set("❌ Erro na conexão SIC")
-                
+                self._status_async("⚠️ Nenhum produto encontrado")
+            
+            # Desconectar
+            self.desconectar_sic()
+            
         except Exception as e:
-            self.status_var.set(f"❌ Erro sincronização: {e}")
-            self.log(f"❌ Erro sincronização: {e}")
+            # Lotes já gravados continuam no banco: descartar os caches de produtos
+            self.root.after(0, self._limpar_caches_produtos)
+            if isinstance(e, sqlite3.OperationalError) and "locked" in str(e):
+                # Outra gravação segurou o banco além do busy timeout: nada de errado com o SIC
+                self._status_async("⚠️ Banco local ocupado - sincronize novamente")
+                self.log("⚠️ Sincronização interrompida, banco local ocupado: %s", e)
+            else:
+                self._status_async(f"❌ Erro sincronização: {e}")
+                self.log("❌ Erro sincronização: %s", e)
             self.desconectar_sic()
 
+    def _limpar_caches_produtos(self):
+        """Descartar todos os produtos em cache (linhas e validador) após a sincronização"""
+        self._cache_produtos.clear()
+        self.product_validator.forget_code()
+
+    def _sync_done(self, total):
+        """Atualizar interface ao fim da sincronização (thread do Tk)"""
+        self._last_sync_ts = datetime.now()
+        self._limpar_caches_produtos()
+        
+        self.label_dados_status.config(
+            text=f"💾 Cache: {total} produtos ({self._last_sync_ts.strftime('%H:%M')})"
+        )
+        
+        # Atualizar lista
+        self.listar_produtos()
+        
+        self.status_var.set(f"✅ Sincronizado! {total} produtos")
+        self.log("✅ Sincronização concluída: %s produtos", total)
+
+    def _status_async(self, mensagem):
+        """Atualizar barra de status a partir de uma thread de background"""
+        try:
+            self.root.after(0, self.status_var.set, mensagem)
+        except (RuntimeError, tk.TclError):
+            pass  # Janela já fechada
+
     def conectar_sic(self):
         """Conectar ao banco SIC com autenticação segura"""
         try:
@@ -1377,11 +1651,11 @@ Cód. | Descrição                    | Qtd | Preço  | Total
                 self.log("❌ Falha na autenticação SIC")
                 return False
             
-            import pyodbc
+            pyodbc = self._importar_modulo("pyodbc")
             
             # Construir string de conexão com credenciais seguras
             conn_string = (
-                f"DRIVER={{ODBC Driver 17 for SQL Server}};"
+                f"{self._driver_sic()}"
                 f"SERVER={sic_credentials['servidor']};"
                 f"DATABASE={sic_credentials['banco']};"
                 f"UID={sic_credentials['usuario']};"
@@ -1397,7 +1671,7 @@ Cód. | Descrição                    | Qtd | Preço  | Total
             return True
             
         except Exception as e:
-            self.log(f"❌ Erro conexão SIC: {e}")
+            self.log("❌ Erro conexão SIC: %s", e)
             self.conectado_sic = False
             return False
 
@@ -1422,8 +1696,8 @@ Cód. | Descrição                    | Qtd | Preço  | Total
         except:
             pass
 
-    def buscar_produtos_sic(self):
-        """Buscar produtos do SIC"""
+    def buscar_produtos_sic(self, tamanho_lote=10000):
+        """Buscar produtos do SIC em lotes (gerador)"""
         try:
             cursor = self.conn_sic.cursor()
             
@@ -1442,87 +1716,215 @@ Cód. | Descrição                    | Qtd | Preço  | Total
             """
             
             cursor.execute(query)
-            produtos = cursor.fetchall()
-            
-            return produtos
+            yield from iter(lambda: cursor.fetchmany(tamanho_lote), [])
             
         except Exception as e:
-            self.log(f"❌ Erro buscar produtos SIC: {e}")
-            return []
+            # Propagar: uma carga parcial não pode apagar o restante do cache
+            self.log("❌ Erro buscar produtos SIC: %s", e)
+            raise
+
+    def salvar_produtos_local(self, lotes, conn):
+        """Salvar lotes de produtos no banco local e retornar quantos foram gravados
 
-    def salvar_produtos_local(self, produtos):
-        """Salvar produtos no banco local"""
+        conn é a conexão própria da sincronização, em autocommit (isolation_level=None).
+        """
+        total = 0
         try:
-            conn = sqlite3.connect("dados/produtos_sic.db")
             cursor = conn.cursor()
             
-            # Limpar produtos antigos
-            cursor.execute("DELETE FROM produtos")
+            # Códigos vistos no SIC (tabela temporária: só desta conexão)
+            cursor.execute("CREATE TEMP TABLE IF NOT EXISTS sync_codigos (codigo TEXT PRIMARY KEY)")
+            cursor.execute("DELETE FROM sync_codigos")
+            
+            for lote in lotes:
+                # pyodbc.Row -> tuple uma única vez
+                linhas = [tuple(produto) for produto in lote]
+                
+                # Uma transação curta por lote: o lock de escrita fica livre enquanto
+                # o próximo lote vem do SIC, e vendas/salvamentos da interface passam
+                with conn:
+                    cursor.execute("BEGIN IMMEDIATE")
+                    
+                    # Inserir/atualizar produtos
+                    cursor.executemany("""
+                        INSERT INTO produtos 
+                        (codigo, descricao, preco_venda, preco_custo, estoque, categoria)
+                        VALUES (?, ?, ?, ?, ?, ?)
+                        ON CONFLICT(codigo) DO UPDATE SET
+                            descricao=excluded.descricao,
+                            preco_venda=excluded.preco_venda,
+                            preco_custo=excluded.preco_custo,
+                            estoque=excluded.estoque,
+                            categoria=excluded.categoria,
+                            ativo=1,
+                            ultima_atualizacao=CURRENT_TIMESTAMP
+                    """, linhas)
+                    cursor.executemany(
+                        "INSERT OR IGNORE INTO sync_codigos (codigo) VALUES (?)",
+                        [(linha[0],) for linha in linhas]
+                    )
+                
+                total += len(linhas)
+                self._status_async(f"📊 Sincronizando produtos... {total}")
+            
+            # SIC sem produtos: manter o cache como está
+            if not total:
+                return 0
             
-            # Inserir produtos
-            for produto in produtos:
+            with conn:
+                cursor.execute("BEGIN IMMEDIATE")
+                
+                # Remover apenas os produtos que saíram do SIC
+                cursor.execute("DELETE FROM produtos WHERE codigo NOT IN (SELECT codigo FROM sync_codigos)")
+                
+                # Atualizar info cache
                 cursor.execute("""
-                    INSERT INTO produtos 
-                    (codigo, descricao, preco_venda, preco_custo, estoque, categoria)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                """, produto)
-            
-            # Atualizar info cache
-            cursor.execute("""
-                INSERT OR REPLACE INTO cache_info 
-                (tipo, ultimo_update, total_registros)
-                VALUES ('produtos', CURRENT_TIMESTAMP, ?)
-            """, (len(produtos),))
-            
-            conn.commit()
-            conn.close()
-            
-            self.label_dados_status.config(
-                text=f"💾 Cache: {len(produtos)} produtos ({datetime.now().strftime('%H:%M')})"
-            )
+                    INSERT OR REPLACE INTO cache_info 
+                    (tipo, ultimo_update, total_registros)
+                    VALUES ('produtos', CURRENT_TIMESTAMP, ?)
+                """, (total,))
+            
+            return total
             
         except Exception as e:
-            self.log(f"❌ Erro salvar produtos local: {e}")
+            self.log("❌ Erro salvar produtos local: %s", e)
+            raise
 
     def listar_produtos(self):
         """Listar produtos na treeview"""
         try:
             # Limpar lista atual
-            for item in self.tree_produtos.get_children():
-                self.tree_produtos.delete(item)
+            self._limpar_tree(self.tree_produtos)
+            self._codigos_produtos = []
             
             # Buscar produtos do banco local
-            conn = sqlite3.connect("dados/produtos_sic.db")
-            cursor = conn.cursor()
+            produtos = self._consultar_local(self.SQL_LISTAR_PRODUTOS)
+            self._codigos_produtos = [linha[0] for linha in produtos]
             
-            cursor.execute("""
-                SELECT codigo, descricao, preco_venda, preco_custo, estoque, categoria, ativo
-                FROM produtos 
-                ORDER BY descricao
-                LIMIT 1000
-            """)
-            
-            produtos = cursor.fetchall()
-            conn.close()
+            # Formatar todas as linhas antes de tocar no Tk
+            linhas = [(
+                codigo,
+                descricao[:50] if descricao else "",  # Limitar descrição
+                f"R$ {preco_venda:.2f}" if preco_venda else "R$ 0,00",
+                f"R$ {preco_custo:.2f}" if preco_custo else "R$ 0,00",
+                estoque or 0,
+                categoria or "",
+                "Ativo" if ativo else "Inativo"
+            ) for codigo, descricao, preco_venda, preco_custo, estoque, categoria, ativo in produtos]
             
             # Inserir na treeview
-            for produto in produtos:
-                codigo, descricao, preco_venda, preco_custo, estoque, categoria, ativo = produto
-                status = "Ativo" if ativo else "Inativo"
-                self.tree_produtos.insert("", tk.END, values=(
-                    codigo,
-                    descricao[:50] if descricao else "",  # Limitar descrição
-                    f"R$ {preco_venda:.2f}" if preco_venda else "R$ 0,00",
-                    f"R$ {preco_custo:.2f}" if preco_custo else "R$ 0,00",
-                    estoque or 0,
-                    categoria or "",
-                    status
-                ))
+            self._inserir_linhas(self.tree_produtos, linhas)
             
-            self.log(f"📋 Listados {len(produtos)} produtos")
+            self.log("📋 Listados %s produtos", len(produtos))
             
         except Exception as e:
-            self.log(f"❌ Erro listar produtos: {e}")
+            self.log("❌ Erro listar produtos: %s", e)
+
+    def _configurar_colunas(self, tree, colunas, larguras):
+        """Definir título e largura de todas as colunas numa única chamada Tcl"""
+        # heading/column só aceitam uma coluna por vez: o laço roda dentro do Tcl
+        script = (
+            "{pares} {foreach {col largura} $pares "
+            f"{{{tree._w} heading $col -text $col; {tree._w} column $col -width $largura}}}}"
+        )
+        pares = tuple(valor for par in zip(colunas, larguras) for valor in par)
+        tree.tk.call("apply", script, pares)
+
+    def _consultar_local(self, sql, parametros=(), um=False):
+        """Consulta na conexão local compartilhada, serializada entre threads"""
+        with self._db_lock:
+            cursor = self._cursor_local()
+            cursor.execute(sql, parametros)
+            return cursor.fetchone() if um else cursor.fetchall()
+
+    def _produto_por_codigo(self, codigo):
+        """Produto (namedtuple) pelo código, com cache LRU em memória (512 códigos)"""
+        codigo = str(codigo)  # Chave sempre texto, como a coluna
+        produto = self._cache_produtos.pop(codigo, None)
+        if produto is None:
+            linha = self._consultar_local(self._sql_produto_por_codigo, (codigo,), um=True)
+            if linha is None:
+                return None
+            produto = Produto._make(linha)
+            if len(self._cache_produtos) >= 512:
+                # Descarta o usado há mais tempo (primeiro da ordem de inserção)
+                self._cache_produtos.pop(next(iter(self._cache_produtos)), None)
+        self._cache_produtos[codigo] = produto
+        return produto
+
+    @contextmanager
+    def _transacao_local(self):
+        """Transação na conexão local compartilhada; COMMIT no fim, ROLLBACK se falhar"""
+        with self._db_lock:
+            cursor = self._cursor_local()
+            cursor.execute("BEGIN IMMEDIATE")
+            try:
+                yield cursor
+            except BaseException:
+                cursor.execute("ROLLBACK")
+                raise
+            cursor.execute("COMMIT")
+
+    def _esquecer_produto(self, codigo):
+        """Descartar o produto dos caches (linha e validador) após alterá-lo"""
+        codigo = str(codigo)
+        self._cache_produtos.pop(codigo, None)
+        self.product_validator.forget_code(codigo)
+
+    def _conectar_banco(self, **opcoes):
+        """Conexão avulsa de gravação no banco local, sem fsync a cada commit"""
+        # WAL já fica gravado no arquivo; synchronous vale por conexão
+        conn = sqlite3.connect("dados/produtos_sic.db", **opcoes)
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _executar_local(self, sql, parametros=()):
+        """Gravação na conexão local compartilhada (autocommit); retorna linhas afetadas"""
+        with self._db_lock:
+            cursor = self._cursor_local()
+            cursor.execute(sql, parametros)
+            return cursor.rowcount
+
+    def _cursor_local(self):
+        """Cursor de self.conn_local reaproveitado dentro da mesma thread"""
+        cursor = getattr(self._cursores, "cursor", None)
+        if cursor is None:
+            cursor = self._cursores.cursor = self.conn_local.cursor()
+        return cursor
+
+    def _limpar_tree(self, tree):
+        """Remover todas as linhas da Treeview numa única chamada"""
+        itens = tree.get_children()
+        if itens:
+            tree.delete(*itens)
+
+    def _inserir_linhas(self, tree, linhas):
+        """Inserir linhas já formatadas na Treeview numa única chamada Tcl"""
+        # O laço roda dentro do Tcl: uma travessia Python -> Tcl para a lista inteira
+        tree.tk.call(
+            "apply", "{w linhas} {foreach v $linhas {$w insert {} end -values $v}}",
+            tree._w, tuple(linhas)
+        )
+
+    def _busca_digitada(self, evento, buscar):
+        """Buscar enquanto digita: só após 200 ms sem mudar o texto; Enter busca na hora"""
+        campo = evento.widget
+        texto = campo.get()
+        enter = evento.keysym in ("Return", "KP_Enter")
+        
+        # Setas, Shift, Home/End etc. não mudam o texto: nada a buscar de novo
+        if not enter and texto == self._busca_textos.get(campo, ""):
+            return
+        
+        after_id = self._busca_after_ids.pop(campo, None)
+        if after_id:
+            self.root.after_cancel(after_id)
+        self._busca_textos[campo] = texto
+        
+        if enter:
+            buscar()
+        else:
+            self._busca_after_ids[campo] = self.root.after(200, buscar)
 
     def buscar_produto(self):
         """Buscar produto específico"""
@@ -1533,68 +1935,40 @@ Cód. | Descrição                    | Qtd | Preço  | Total
         
         try:
             # Limpar lista
-            for item in self.tree_produtos.get_children():
-                self.tree_produtos.delete(item)
-            
-            conn = sqlite3.connect("dados/produtos_sic.db")
-            cursor = conn.cursor()
+            self._limpar_tree(self.tree_produtos)
+            self._codigos_produtos = []
             
-            cursor.execute("""
-                SELECT codigo, descricao, preco_venda, estoque
-                FROM produtos 
-                WHERE codigo LIKE ? OR descricao LIKE ?
-                ORDER BY descricao
-                LIMIT 100
-            """, (f"%{termo}%", f"%{termo}%"))
-            
-            produtos = cursor.fetchall()
-            conn.close()
+            produtos = self._consultar_local(self.SQL_BUSCAR_PRODUTOS, (f"%{termo}%", f"%{termo}%"))
+            self._codigos_produtos = [linha[0] for linha in produtos]
             
             # Inserir resultados
-            for produto in produtos:
-                codigo, descricao, preco, estoque = produto
-                self.tree_produtos.insert("", tk.END, values=(
-                    codigo,
-                    descricao[:50],
-                    f"R$ {preco:.2f}" if preco else "R$ 0,00",
-                    estoque or 0
-                ))
+            self._inserir_linhas(self.tree_produtos, [(
+                codigo,
+                descricao[:50],
+                f"R$ {preco:.2f}" if preco else "R$ 0,00",
+                estoque or 0
+            ) for codigo, descricao, preco, estoque in produtos])
             
-            self.log(f"🔍 Encontrados {len(produtos)} produtos para '{termo}'")
+            self.log("🔍 Encontrados %s produtos para '%s'", len(produtos), termo)
             
         except Exception as e:
-            self.log(f"❌ Erro buscar produto: {e}")
+            self.log("❌ Erro buscar produto: %s", e)
 
     def exportar_produtos_excel(self):
         """Exportar produtos para Excel"""
         try:
-            # Verificar se tem pandas
+            # Verificar se tem openpyxl
             try:
-                import pandas as pd
+                openpyxl = self._importar_modulo("openpyxl")
             except ImportError:
                 messagebox.showerror(
-                    "Pandas Necessário",
-                    "❌ Pandas não instalado!\n\n" +
-                    "💡 Execute: pip install pandas openpyxl"
+                    "Openpyxl Necessário",
+                    "❌ Openpyxl não instalado!\n\n" +
+                    "💡 Execute: pip install openpyxl"
                 )
                 return
             
-            # Buscar produtos
-            conn = sqlite3.connect("dados/produtos_sic.db")
-            df = pd.read_sql_query("""
-                SELECT 
-                    codigo as 'Código',
-                    descricao as 'Descrição',
-                    preco_venda as 'Preço Venda',
-                    preco_custo as 'Preço Custo',
-                    estoque as 'Estoque',
-                    categoria as 'Categoria'
-                FROM produtos 
-                ORDER BY descricao
-            """, conn)
-            conn.close()
-            
-            if df.empty:
+            if self._consultar_local("SELECT 1 FROM produtos LIMIT 1", um=True) is None:
                 messagebox.showwarning("Sem Dados", "❌ Nenhum produto para exportar!")
                 return
             
@@ -1606,180 +1980,202 @@ Cód. | Descrição                    | Qtd | Preço  | Total
             )
             
             if arquivo:
+                # Buscar produtos e gravar em modo write-only
+                produtos = self._consultar_local("""
+                    SELECT codigo, descricao, preco_venda, preco_custo, estoque, categoria
+                    FROM produtos 
+                    ORDER BY descricao
+                """)
+                
+                wb = openpyxl.Workbook(write_only=True)
+                ws = wb.create_sheet("Produtos")
+                ws.append(["Código", "Descrição", "Preço Venda", "Preço Custo", "Estoque", "Categoria"])
+                for linha in produtos:
+                    ws.append(linha)
+                
                 # Salvar Excel
-                df.to_excel(arquivo, index=False, sheet_name="Produtos")
+                wb.save(arquivo)
                 
-                self.log(f"📊 Produtos exportados: {arquivo}")
+                self.log("📊 Produtos exportados: %s", arquivo)
                 
                 # Perguntar se quer abrir
                 if messagebox.askyesno("Exportado!", f"✅ Arquivo salvo!\n\n📂 {arquivo}\n\nAbrir agora?"):
-                    os.startfile(arquivo)
+                    self._abrir_externo(arquivo)
             
         except Exception as e:
-            self.log(f"❌ Erro exportar Excel: {e}")
+            self.log("❌ Erro exportar Excel: %s", e)
             messagebox.showerror("Erro", f"Erro ao exportar:\n{e}")
 
     def gerar_talao_balcao(self):
         """Gerar talão de balcão"""
         try:
-            # Criar pasta relatórios
-            os.makedirs("relatorios", exist_ok=True)
+            # Criar pasta relatórios (uma vez por sessão)
+            if not self._relatorios_ready:
+                os.makedirs("relatorios", exist_ok=True)
+                self._relatorios_ready = True
             
             # Nome arquivo
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            agora = datetime.now()
+            timestamp = agora.strftime("%Y%m%d_%H%M%S")
             arquivo = f"relatorios/talao_balcao_{timestamp}.txt"
             
             # Gerar conteúdo
-            conteudo = f"""
-{'='*60}
-           MADEIREIRA MARIA LUIZA
-        Rua das Madeiras, 456 - Sua Cidade - SP
-            (11) 9999-8888 | CNPJ: XX.XXX.XXX/0001-XX
-{'='*60}
-
-              TALÃO DE BALCÃO - VIA CLIENTE
-
-Nº: {timestamp[-6:]}        Data: {datetime.now().strftime('%d/%m/%Y %H:%M')}
-Vendedor: ________________________________
-
-Cliente: _____________________________________
-CPF/CNPJ: ___________________________________
-
-{'='*60}
-Cód. | Descrição                    | Qtd | Preço  | Total
-{'='*60}
-     |                              |     |        |
-     |                              |     |        |
-     |                              |     |        |
-     |                              |     |        |
-     |                              |     |        |
-     |                              |     |        |
-{'='*60}
-
-                              SUBTOTAL: R$ _______
-                              DESCONTO: R$ _______
-                                 TOTAL: R$ _______
-
-Forma Pagamento: ____________________________
-
-Observações:
-_____________________________________________
-_____________________________________________
-
-{'='*60}
-    Obrigado pela preferência! Volte sempre!
-           MADEIREIRA MARIA LUIZA
-{'='*60}
-"""
+            conteudo = _TALAO_TEMPLATE.format(
+                numero=timestamp[-6:],
+                data=agora.strftime('%d/%m/%Y %H:%M')
+            )
             
             # Salvar arquivo
             with open(arquivo, 'w', encoding='utf-8') as f:
                 f.write(conteudo)
             
-            self.log(f"🖨️ Talão gerado: {arquivo}")
+            self.log("🖨️ Talão gerado: %s", arquivo)
             
             # Abrir arquivo
             if messagebox.askyesno("Talão Gerado", f"✅ Talão criado!\n\n📄 {arquivo}\n\nAbrir para impressão?"):
-                os.startfile(arquivo)
+                self._abrir_externo(arquivo)
                 
         except Exception as e:
-            self.log(f"❌ Erro gerar talão: {e}")
+            self.log("❌ Erro gerar talão: %s", e)
 
     def gerar_relatorio_produtos(self):
-        """Gerar relatório completo de produtos"""
+        """Gerar relatório completo de produtos em background"""
+        threading.Thread(target=self._relatorio_produtos_worker, daemon=True).start()
+
+    def _relatorio_produtos_worker(self):
+        """Montar o relatório completo (fora da thread do Tk)"""
         try:
-            # Verificar pandas
-            try:
-                import pandas as pd
-            except ImportError:
-                # Gerar relatório simples sem pandas
-                self.gerar_relatorio_simples()
-                return
-            
-            conn = sqlite3.connect("dados/produtos_sic.db")
-            df = pd.read_sql_query("""
-                SELECT * FROM produtos ORDER BY descricao
-            """, conn)
-            conn.close()
+            # Análises direto no SQLite: uma linha em vez da tabela inteira
+            total_produtos, valor_estoque, produtos_sem_estoque, preco_medio = self._consultar_local(
+                self.SQL_RESUMO_ESTOQUE, um=True
+            )
             
-            if df.empty:
-                messagebox.showwarning("Sem Dados", "❌ Nenhum produto no cache!")
+            if not total_produtos:
+                self.root.after(0, messagebox.showwarning, "Sem Dados", "❌ Nenhum produto no cache!")
                 return
             
-            # Análises
-            total_produtos = len(df)
-            valor_estoque = (df['preco_venda'] * df['estoque']).sum()
-            produtos_sem_estoque = len(df[df['estoque'] <= 0])
+            # Verificar pandas (só para montar a planilha detalhada)
+            try:
+                pd = self._importar_modulo("pandas")
+            except ImportError:
+                # Gerar relatório simples sem pandas (já estamos em background)
+                self._relatorio_simples_worker()
+                return
             
-            # Arquivo relatório
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            # Conexão própria da thread: a leitura longa não disputa a conexão da interface
+            conn = self._conectar_banco()
+            try:
+                df = pd.read_sql_query("""
+                    SELECT * FROM produtos ORDER BY descricao
+                """, conn)
+            finally:
+                conn.close()
+            
+            # Arquivo relatório (um único horário para nome e conteúdo)
+            agora = datetime.now()
+            timestamp = agora.strftime("%Y%m%d_%H%M%S")
             arquivo_excel = f"relatorios/relatorio_produtos_{timestamp}.xlsx"
             
             # Criar pasta
             os.makedirs("relatorios", exist_ok=True)
             
-            # Salvar Excel com múltiplas abas
-            with pd.ExcelWriter(arquivo_excel, engine='openpyxl') as writer:
-                # Aba principal
-                df.to_excel(writer, sheet_name='Produtos', index=False)
-                
-                # Aba resumo
-                resumo = pd.DataFrame({
-                    'Métrica': [
-                        'Total de Produtos',
-                        'Valor Total Estoque',
-                        'Produtos sem Estoque',
-                        'Preço Médio',
-                        'Data Relatório'
-                    ],
-                    'Valor': [
-                        total_produtos,
-                        f"R$ {valor_estoque:.2f}",
-                        produtos_sem_estoque,
-                        f"R$ {df['preco_venda'].mean():.2f}",
-                        datetime.now().strftime('%d/%m/%Y %H:%M')
-                    ]
-                })
-                resumo.to_excel(writer, sheet_name='Resumo', index=False)
-                
-                # Top 20 mais caros
-                top_caros = df.nlargest(20, 'preco_venda')[['codigo', 'descricao', 'preco_venda']]
-                top_caros.to_excel(writer, sheet_name='Top Preços', index=False)
+            # Aba resumo
+            resumo = pd.DataFrame({
+                'Métrica': [
+                    'Total de Produtos',
+                    'Valor Total Estoque',
+                    'Produtos sem Estoque',
+                    'Preço Médio',
+                    'Data Relatório'
+                ],
+                'Valor': [
+                    total_produtos,
+                    f"R$ {valor_estoque:.2f}",
+                    produtos_sem_estoque,
+                    f"R$ {preco_medio:.2f}",
+                    agora.strftime('%d/%m/%Y %H:%M')
+                ]
+            })
+            
+            # Top 20 mais caros direto no SQLite: percorre o índice de preço de trás
+            # para frente e para em 20 linhas (sem preço fica por último)
+            top_caros = pd.DataFrame(self._consultar_local("""
+                SELECT codigo, descricao, preco_venda
+                FROM produtos
+                ORDER BY preco_venda DESC, descricao
+                LIMIT 20
+            """), columns=['codigo', 'descricao', 'preco_venda'])
+            
+            abas = (('Produtos', df), ('Resumo', resumo), ('Top Preços', top_caros))
+            
+            # Salvar Excel com múltiplas abas (pyexcelerate é bem mais rápido se instalado)
+            try:
+                pyexcelerate = self._importar_modulo("pyexcelerate")
+            except ImportError:
+                pyexcelerate = None
+            
+            try:
+                xlsxwriter = self._importar_modulo("xlsxwriter")
+            except ImportError:
+                xlsxwriter = None
+            
+            if pyexcelerate or xlsxwriter:
+                # Linhas simples com cabeçalho; NaN -> célula vazia, como no to_excel
+                abas = [
+                    (nome, [tabela.columns.tolist()] +
+                     tabela.astype(object).where(tabela.notna(), None).values.tolist())
+                    for nome, tabela in abas
+                ]
+            
+            if pyexcelerate:
+                wb = pyexcelerate.Workbook()
+                for nome, linhas in abas:
+                    wb.new_sheet(nome, data=linhas)
+                wb.save(arquivo_excel)
+            elif xlsxwriter:
+                # constant_memory grava linha a linha; por isso não passa pelo to_excel,
+                # que escreve coluna por coluna
+                wb = xlsxwriter.Workbook(arquivo_excel, {'constant_memory': True})
+                for nome, linhas in abas:
+                    ws = wb.add_worksheet(nome)
+                    for numero, linha in enumerate(linhas):
+                        ws.write_row(numero, 0, linha)
+                wb.close()
+            else:
+                with pd.ExcelWriter(arquivo_excel, engine='openpyxl') as writer:
+                    for nome, tabela in abas:
+                        tabela.to_excel(writer, sheet_name=nome, index=False)
             
-            self.log(f"📊 Relatório gerado: {arquivo_excel}")
+            self.log("📊 Relatório gerado: %s", arquivo_excel)
             
             # Abrir arquivo
-            if messagebox.askyesno("Relatório Gerado", f"✅ Relatório criado!\n\n📊 {arquivo_excel}\n\nAbrir agora?"):
-                os.startfile(arquivo_excel)
+            self.root.after(0, self._perguntar_abrir, "Relatório Gerado",
+                            f"✅ Relatório criado!\n\n📊 {arquivo_excel}\n\nAbrir agora?", arquivo_excel)
                 
         except Exception as e:
-            self.log(f"❌ Erro gerar relatório: {e}")
+            self.log("❌ Erro gerar relatório: %s", e)
 
     def gerar_relatorio_simples(self):
-        """Gerar relatório simples sem pandas"""
+        """Gerar relatório simples sem pandas em background"""
+        threading.Thread(target=self._relatorio_simples_worker, daemon=True).start()
+
+    def _relatorio_simples_worker(self):
+        """Montar o relatório simples (fora da thread do Tk)"""
         try:
-            conn = sqlite3.connect("dados/produtos_sic.db")
-            cursor = conn.cursor()
-            
-            cursor.execute("SELECT COUNT(*) FROM produtos")
-            total = cursor.fetchone()[0]
-            
-            cursor.execute("SELECT SUM(preco_venda * estoque) FROM produtos")
-            valor_estoque = cursor.fetchone()[0] or 0
-            
-            cursor.execute("SELECT COUNT(*) FROM produtos WHERE estoque <= 0")
-            sem_estoque = cursor.fetchone()[0]
-            
-            conn.close()
+            # Uma única varredura, mesma consulta (já preparada) do relatório completo
+            total, valor_estoque, sem_estoque, _ = self._consultar_local(
+                self.SQL_RESUMO_ESTOQUE, um=True
+            )
             
-            # Arquivo texto
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            # Arquivo texto (um único horário para nome e conteúdo)
+            agora = datetime.now()
+            timestamp = agora.strftime("%Y%m%d_%H%M%S")
             arquivo = f"relatorios/relatorio_simples_{timestamp}.txt"
             
             os.makedirs("relatorios", exist_ok=True)
             
             conteudo = f"""
-RELATÓRIO DE PRODUTOS - {datetime.now().strftime('%d/%m/%Y %H:%M')}
+RELATÓRIO DE PRODUTOS - {agora.strftime('%d/%m/%Y %H:%M')}
 {'='*50}
 
 Total de Produtos: {total}
@@ -1793,32 +2189,23 @@ Relatório gerado pelo Sistema PDV
             with open(arquivo, 'w', encoding='utf-8') as f:
                 f.write(conteudo)
             
-            self.log(f"📄 Relatório simples: {arquivo}")
+            self.log("📄 Relatório simples: %s", arquivo)
             
-            if messagebox.askyesno("Relatório Gerado", f"✅ Relatório criado!\n\n📄 {arquivo}\n\nAbrir agora?"):
-                os.startfile(arquivo)
+            self.root.after(0, self._perguntar_abrir, "Relatório Gerado",
+                            f"✅ Relatório criado!\n\n📄 {arquivo}\n\nAbrir agora?", arquivo)
                 
         except Exception as e:
-            self.log(f"❌ Erro relatório simples: {e}")
+            self.log("❌ Erro relatório simples: %s", e)
+
+    def _perguntar_abrir(self, titulo, mensagem, caminho):
+        """Perguntar (na thread do Tk) se o arquivo gerado deve ser aberto"""
+        if messagebox.askyesno(titulo, mensagem):
+            self._abrir_externo(caminho)
 
     def analise_precos(self):
         """Análise de preços"""
         try:
-            conn = sqlite3.connect("dados/produtos_sic.db")
-            cursor = conn.cursor()
-            
-            cursor.execute("""
-                SELECT 
-                    AVG(preco_venda) as preco_medio,
-                    MIN(preco_venda) as preco_min,
-                    MAX(preco_venda) as preco_max,
-                    COUNT(*) as total
-                FROM produtos 
-                WHERE preco_venda > 0
-            """)
-            
-            resultado = cursor.fetchone()
-            conn.close()
+            resultado = self._consultar_local(self.SQL_ANALISE_PRECOS, um=True)
             
             if resultado and resultado[3] > 0:
                 preco_medio, preco_min, preco_max, total = resultado
@@ -1838,15 +2225,12 @@ Maior preço: R$ {preco_max:.2f}
                 messagebox.showwarning("Sem Dados", "❌ Nenhum produto com preço para análise!")
                 
         except Exception as e:
-            self.log(f"❌ Erro análise preços: {e}")
+            self.log("❌ Erro análise preços: %s", e)
 
     def produtos_em_falta(self):
         """Listar produtos em falta"""
         try:
-            conn = sqlite3.connect("dados/produtos_sic.db")
-            cursor = conn.cursor()
-            
-            cursor.execute("""
+            produtos = self._consultar_local("""
                 SELECT codigo, descricao, estoque
                 FROM produtos 
                 WHERE estoque <= 0
@@ -1854,9 +2238,6 @@ Maior preço: R$ {preco_max:.2f}
                 LIMIT 50
             """)
             
-            produtos = cursor.fetchall()
-            conn.close()
-            
             if produtos:
                 # Criar janela com lista
                 janela = tk.Toplevel(self.root)
@@ -1864,26 +2245,25 @@ Maior preço: R$ {preco_max:.2f}
                 janela.geometry("600x400")
                 
                 # Lista
-                colunas = ("Código", "Descrição", "Estoque")
-                tree = ttk.Treeview(janela, columns=colunas, show="headings")
+                tree = ttk.Treeview(janela, columns=self.COLUNAS_FALTA, show="headings")
                 
-                for col in colunas:
+                for col in self.COLUNAS_FALTA:
                     tree.heading(col, text=col)
                 
-                for produto in produtos:
-                    tree.insert("", tk.END, values=produto)
+                # Preencher antes do pack: nenhuma geometria recalculada por linha
+                self._inserir_linhas(tree, produtos)
                 
                 tree.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
                 
                 # Botão fechar
                 ttk.Button(janela, text="Fechar", command=janela.destroy).pack(pady=5)
                 
-                self.log(f"📈 {len(produtos)} produtos em falta listados")
+                self.log("📈 %s produtos em falta listados", len(produtos))
             else:
                 messagebox.showinfo("Parabéns!", "✅ Nenhum produto em falta!")
                 
         except Exception as e:
-            self.log(f"❌ Erro produtos em falta: {e}")
+            self.log("❌ Erro produtos em falta: %s", e)
 
     def criar_template_talao_cliente(self):
         """Criar template talão cliente"""
@@ -1903,20 +2283,15 @@ Maior preço: R$ {preco_max:.2f}
             # Criar pasta templates
             os.makedirs("templates", exist_ok=True)
             
-            arquivo = f"templates/{tipo}_template.ods"
+            arquivo = f"templates/{tipo}_template.csv"
             
-            # Verificar se LibreOffice está instalado
-            calc_paths = [
-                r"C:\Program Files\LibreOffice\program\scalc.exe",
-                r"C:\Program Files (x86)\LibreOffice\program\scalc.exe",
-                r"C:\LibreOffice\program\scalc.exe"
-            ]
-            
-            calc_exe = None
-            for path in calc_paths:
-                if os.path.exists(path):
-                    calc_exe = path
-                    break
+            # Verificar se LibreOffice está instalado (só até encontrar uma vez)
+            if self._calc_exe is None:
+                for path in CALC_PATHS:
+                    if os.path.exists(path):
+                        self._calc_exe = path
+                        break
+            calc_exe = self._calc_exe
             
             if not calc_exe:
                 messagebox.showerror(
@@ -1927,20 +2302,16 @@ Maior preço: R$ {preco_max:.2f}
                 )
                 return
             
-            # Criar arquivo template básico se não existir
+            # Criar arquivo template básico se não existir (bytes prontos, uma escrita)
             if not os.path.exists(arquivo):
-                # Criar conteúdo básico
-                conteudo_template = self.gerar_conteudo_template(tipo, titulo)
-                
-                # Escrever arquivo temporário CSV para converter
-                arquivo_temp = f"templates/{tipo}_temp.csv"
-                with open(arquivo_temp, 'w', encoding='utf-8') as f:
-                    f.write(conteudo_template)
+                with open(arquivo, 'wb') as f:
+                    f.write(TEMPLATES[tipo])
                 
-                self.log(f"📄 Template base criado: {arquivo}")
+                self.log("📄 Template base criado: %s", arquivo)
             
-            # Abrir LibreOffice
-            subprocess.Popen([calc_exe, arquivo_temp if 'arquivo_temp' in locals() else arquivo])
+            # Abrir LibreOffice (sempre o mesmo arquivo, criado agora ou antes)
+            import subprocess
+            subprocess.Popen([calc_exe, arquivo])
             
             messagebox.showinfo(
                 "Template Aberto",
@@ -1951,62 +2322,18 @@ Maior preço: R$ {preco_max:.2f}
             )
             
         except Exception as e:
-            self.log(f"❌ Erro criar template: {e}")
+            self.log("❌ Erro criar template: %s", e)
             messagebox.showerror("Erro", f"Erro ao criar template:\n{e}")
 
-    def gerar_conteudo_template(self, tipo, titulo):
-        """Gerar conteúdo base para template"""
-        if tipo == "talao_cliente":
-            return """EMPRESA,MADEIREIRA MARIA LUIZA 
-ENDEREÇO,Rua do Comércio 123 - Sua Cidade - SP
-TELEFONE,(11) 1234-5678
-CNPJ,XX.XXX.XXX/0001-XX
-
-DOCUMENTO,TALÃO DE BALCÃO - VIA CLIENTE
-NÚMERO,
-DATA,
-VENDEDOR,
-
-CLIENTE,
-CPF/CNPJ,
-
-CÓDIGO,DESCRIÇÃO,QTD,PREÇO,TOTAL
-            """
-        elif tipo == "talao_loja":
-            return """EMPRESA,MADEIREIRA MARIA LUIZA 
-ENDEREÇO,Rua do Comércio 123 - Sua Cidade - SP
-TELEFONE,(11) 1234-5678
-CNPJ,XX.XXX.XXX/0001-XX
-
-DOCUMENTO,TALÃO DE BALCÃO - VIA LOJA
-NÚMERO,
-DATA,
-VENDEDOR,
-
-CLIENTE,
-CPF/CNPJ,
-
-CÓDIGO,DESCRIÇÃO,QTD,PREÇO,TOTAL
-            """
-        else:  # relatório
-            return """EMPRESA,MADEIREIRA MARIA LUIZA 
-RELATÓRIO,PRODUTOS EM ESTOQUE
-DATA,
-TOTAL PRODUTOS,
-VALOR ESTOQUE,
-
-CÓDIGO,DESCRIÇÃO,PREÇO,ESTOQUE,TOTAL
-            """
-
     def abrir_pasta_templates(self):
         """Abrir pasta templates no Windows Explorer"""
         try:
             pasta = os.path.abspath("templates")
             os.makedirs(pasta, exist_ok=True)
-            os.startfile(pasta)
+            self._abrir_externo(pasta)
             self.log("📂 Pasta templates aberta")
         except Exception as e:
-            self.log(f"❌ Erro abrir pasta: {e}")
+            self.log("❌ Erro abrir pasta: %s", e)
 
     def testar_conexao_sic(self):
         """Testar conexão com SIC"""
@@ -2047,11 +2374,12 @@ CÓDIGO,DESCRIÇÃO,PREÇO,ESTOQUE,TOTAL
         except Exception as e:
             messagebox.showerror("Erro", f"Erro no teste:\n{e}")
             self.status_var.set("❌ Erro no teste de conexão")
-            self.log(f"❌ Erro teste conexão: {e}")
+            self.log("❌ Erro teste conexão: %s", e)
 
     def forcar_modo_offline(self):
         """Forçar modo offline"""
         self.desconectar_sic()
+        self._fechar_sonda_sic()  # Libera o SIC de verdade: nenhuma conexão fica aberta
         self.modo_offline = True
         self.label_sic_status.config(
             text="💾 MODO OFFLINE FORÇADO",
@@ -2072,35 +2400,26 @@ CÓDIGO,DESCRIÇÃO,PREÇO,ESTOQUE,TOTAL
             if not self.var_auto_sync.get():
                 return
             
-            # Verificar se última sync foi há mais de 1 hora
-            conn = sqlite3.connect("dados/produtos_sic.db")
-            cursor = conn.cursor()
-            
-            cursor.execute("""
-                SELECT ultimo_update FROM cache_info 
-                WHERE tipo = 'produtos'
-            """)
-            
-            resultado = cursor.fetchone()
-            conn.close()
+            # Verificar se última sync foi há mais de 1 hora; o banco só é
+            # consultado enquanto não há horário em memória (início da sessão)
+            if self._last_sync_ts is None:
+                resultado = self._consultar_local("""
+                    SELECT ultimo_update FROM cache_info 
+                    WHERE tipo = 'produtos'
+                """, um=True)
+                
+                if resultado:
+                    self._last_sync_ts = datetime.fromisoformat(resultado[0])
             
-            if resultado:
-                ultimo_update = datetime.fromisoformat(resultado[0])
+            if self._last_sync_ts:
                 agora = datetime.now()
-                diferenca = (agora - ultimo_update).total_seconds() / 3600
+                diferenca = (agora - self._last_sync_ts).total_seconds() / 3600
                 
                 if diferenca < 1:  # Menos de 1 hora
                     return
             
             # Sincronizar em background
-            def sync_background():
-                try:
-                    self.sincronizar_dados_sic()
-                except:
-                    pass
-            
-            thread = threading.Thread(target=sync_background, daemon=True)
-            thread.start()
+            self.sincronizar_dados_sic()
             
         except:
             pass
@@ -2113,6 +2432,11 @@ CÓDIGO,DESCRIÇÃO,PREÇO,ESTOQUE,TOTAL
             self.usuario_sql = self.entry_usuario.get()
             self.senha_sql = self.entry_senha.get()
             
+            # Nova configuração: refazer string e sonda na próxima verificação
+            with self._probe_lock:
+                self._sic_conn_str = None
+                self._fechar_sonda_sic()
+            
             # Salvar em arquivo
             config = {
                 'servidor': self.servidor_sql,
@@ -2121,33 +2445,102 @@ CÓDIGO,DESCRIÇÃO,PREÇO,ESTOQUE,TOTAL
                 'senha': self.senha_sql
             }
             
-            import json
+            # Serializar antes e gravar numa única escrita
+            payload = json.dumps(config, separators=(',', ':'))
             with open('dados/config.json', 'w') as f:
-                json.dump(config, f)
+                f.write(payload)
             
             messagebox.showinfo("Configurações", "✅ Configurações salvas!")
             self.log("⚙️ Configurações salvas")
             
         except Exception as e:
-            self.log(f"❌ Erro salvar config: {e}")
+            self.log("❌ Erro salvar config: %s", e)
 
-    def log(self, mensagem):
-        """Adicionar mensagem ao log"""
+    def log(self, mensagem, *args):
+        """Adicionar mensagem ao log (args formatados com % só se exibida)"""
+        if not self._log_enabled:
+            return
         try:
+            if args:
+                mensagem = mensagem % args
             timestamp = datetime.now().strftime("%H:%M:%S")
-            log_msg = f"[{timestamp}] {mensagem}\n"
+            self._log_buffer.append(f"[{timestamp}] {mensagem}\n")
             
-            self.text_log.insert(tk.END, log_msg)
+            # Agrupar mensagens próximas numa única atualização do Text
+            if not self._log_flush_scheduled:
+                self._log_flush_scheduled = True
+                self.root.after(200, self._flush_log)
+                
+        except:
+            pass
+
+    def _flush_log(self):
+        """Gravar no Text todas as mensagens acumuladas de uma vez"""
+        self._log_flush_scheduled = False
+        mensagens, self._log_buffer = self._log_buffer, []
+        if not mensagens:
+            return
+        try:
+            texto = "".join(mensagens)
+            self.text_log.insert(tk.END, texto)
             self.text_log.see(tk.END)
             
-            # Manter apenas últimas 100 linhas
-            linhas = self.text_log.get("1.0", tk.END).split('\n')
-            if len(linhas) > 100:
-                self.text_log.delete("1.0", f"{len(linhas)-100}.0")
+            # Manter apenas últimas 100 linhas (contador, sem copiar o widget inteiro)
+            self._log_lines += texto.count("\n")
+            excesso = self._log_lines - 100
+            if excesso > 0:
+                self.text_log.delete("1.0", f"{excesso + 1}.0")
+                self._log_lines = 100
                 
         except:
             pass
 
+    def _abrir_externo(self, caminho):
+        """Abrir arquivo/pasta no programa associado sem bloquear a interface"""
+        # Criar o processo também fica fora da thread do Tk
+        threading.Thread(target=self._abrir_externo_worker, args=(caminho,), daemon=True).start()
+
+    def _abrir_externo_worker(self, caminho):
+        """Disparar o programa associado (thread de background)"""
+        import subprocess
+        try:
+            if sys.platform == "win32":
+                subprocess.Popen(
+                    ["cmd", "/c", "start", "", caminho], close_fds=True,
+                    creationflags=subprocess.DETACHED_PROCESS | subprocess.CREATE_NEW_PROCESS_GROUP
+                )
+            else:
+                subprocess.Popen(["xdg-open", caminho], close_fds=True, start_new_session=True)
+        except Exception as e:
+            self.log("❌ Erro ao abrir %s: %s", caminho, e)
+
+    def _importar_modulo(self, nome):
+        """Importar módulo pesado na primeira utilização e reaproveitá-lo"""
+        modulo = self._modulos.get(nome)
+        if modulo is None:
+            modulo = self._modulos[nome] = importlib.import_module(nome)
+            if nome == "pyodbc":
+                modulo.pooling = True  # Precisa valer antes da primeira conexão
+        return modulo
+
+    def fechar(self):
+        """Fechar janela liberando a conexão local"""
+        self._stop_event.set()
+        if self._sic_after_id:
+            self.root.after_cancel(self._sic_after_id)
+        if self._backup_after_id:
+            self.root.after_cancel(self._backup_after_id)
+        if self._aviso_after_id:
+            self.root.after_cancel(self._aviso_after_id)
+        self._sync_fila.put(None)
+        self._log_enabled = False
+        self._fechar_sonda_sic()
+        try:
+            self.conn_local.close()
+        except Exception:
+            pass
+        self.root.destroy()
+
     def run(self):
         """Executar aplicação"""
         try:
@@ -2156,7 +2549,34 @@ CÓDIGO,DESCRIÇÃO,PREÇO,ESTOQUE,TOTAL
             self.desconectar_sic()
             self.root.quit()
 
+def main():
+    """Ponto de entrada; --profile grava um perfil cProfile em logs/"""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Sistema PDV - Madeireira Maria Luiza")
+    parser.add_argument("--profile", action="store_true",
+                        help="executar sob cProfile e salvar logs/pdv_<data>.pstats")
+    args = parser.parse_args()
+    
+    app = SistemaPDV()
+    
+    if not args.profile:
+        app.run()
+        return
+    
+    import cProfile
+    os.makedirs("logs", exist_ok=True)
+    caminho = os.path.join("logs", f"pdv_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pstats")
+    
+    prof = cProfile.Profile()
+    prof.enable()
+    try:
+        app.run()
+    finally:
+        prof.disable()
+        prof.dump_stats(caminho)
+        print(f"📈 Perfil salvo em {caminho} (abrir com snakeviz)")
+
 # Executar sistema
 if __name__ == "__main__":
-    app = SistemaPDV()
-    app.run()
\ No newline at end of file
+    main()
\ No newline at end of file
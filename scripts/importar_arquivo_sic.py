@@ -4,10 +4,14 @@ import csv
 import pandas as pd
 import sqlite3
 import os
+import re
 from tkinter import filedialog, messagebox
 import json
 
 class ImportadorSIC:
+    # Compilado uma vez: safe_float roda para cada valor importado
+    _NAO_NUMERICO_RE = re.compile(r'[^\d.-]')
+    
     def __init__(self):
         self.tipos_suportados = {
             'XML': ['.xml'],
@@ -425,8 +429,7 @@ class ImportadorSIC:
             # Remove caracteres não numéricos exceto . e , - MELHORADO
             valor_str = str(valor).replace(',', '.').strip()
             # Remove espaços e outros caracteres
-            import re
-            valor_str = re.sub(r'[^\d.-]', '', valor_str)
+            valor_str = self._NAO_NUMERICO_RE.sub('', valor_str)
             return float(valor_str) if valor_str else 0.0
         except:
             return 0.0
@@ -89,7 +89,7 @@ class LocalDatabase:
                 logger.info("Local database initialized successfully")
                 
         except Exception as e:
-            logger.error(f"Error initializing database: {e}")
+            logger.error("Error initializing database: %s", e)
             raise
     
     def get_all_products(self) -> List[Dict[str, Any]]:
@@ -107,7 +107,7 @@ class LocalDatabase:
                 return [dict(row) for row in cursor.fetchall()]
                 
         except Exception as e:
-            logger.error(f"Error getting products: {e}")
+            logger.error("Error getting products: %s", e)
             return []
     
     def get_product_by_code(self, codigo: str) -> Optional[Dict[str, Any]]:
@@ -123,7 +123,7 @@ class LocalDatabase:
                 return dict(row) if row else None
                 
         except Exception as e:
-            logger.error(f"Error getting product {codigo}: {e}")
+            logger.error("Error getting product %s: %s", codigo, e)
             return None
     
     def insert_or_update_product(self, produto: Dict[str, Any]) -> bool:
@@ -186,7 +186,7 @@ class LocalDatabase:
                 return True
                 
         except Exception as e:
-            logger.error(f"Error inserting/updating product: {e}")
+            logger.error("Error inserting/updating product: %s", e)
             return False
     
     def sync_products_from_sic(self, produtos_sic: List[Dict[str, Any]]) -> int:
@@ -200,11 +200,11 @@ class LocalDatabase:
             # Update sync status
             self.update_sync_status(len(produtos_sic), 'online')
             
-            logger.info(f"Synced {count} products from SIC")
+            logger.info("Synced %s products from SIC", count)
             return count
             
         except Exception as e:
-            logger.error(f"Error syncing products: {e}")
+            logger.error("Error syncing products: %s", e)
             return 0
     
     def update_sync_status(self, total_produtos: int, status: str):
@@ -224,7 +224,7 @@ class LocalDatabase:
                 conn.commit()
                 
         except Exception as e:
-            logger.error(f"Error updating sync status: {e}")
+            logger.error("Error updating sync status: %s", e)
     
     def get_sync_status(self) -> Dict[str, Any]:
         """Get current synchronization status"""
@@ -243,7 +243,7 @@ class LocalDatabase:
                 }
                 
         except Exception as e:
-            logger.error(f"Error getting sync status: {e}")
+            logger.error("Error getting sync status: %s", e)
             return {'status': 'error'}
     
     def search_products(self, search_term: str) -> List[Dict[str, Any]]:
@@ -264,7 +264,7 @@ class LocalDatabase:
                 return [dict(row) for row in cursor.fetchall()]
                 
         except Exception as e:
-            logger.error(f"Error searching products: {e}")
+            logger.error("Error searching products: %s", e)
             return []
     
     def record_movement(self, tipo: str, produto_codigo: str, quantidade: int, 
@@ -290,7 +290,7 @@ class LocalDatabase:
                 return True
                 
         except Exception as e:
-            logger.error(f"Error recording movement: {e}")
+            logger.error("Error recording movement: %s", e)
             return False
     
     def get_pending_movements(self) -> List[Dict[str, Any]]:
@@ -316,7 +316,7 @@ class LocalDatabase:
                 return movements
                 
         except Exception as e:
-            logger.error(f"Error getting pending movements: {e}")
+            logger.error("Error getting pending movements: %s", e)
             return []
     
     def create_product(self, produto_data: Dict[str, Any]) -> bool:
@@ -328,7 +328,7 @@ class LocalDatabase:
                 # Check if product code already exists
                 cursor.execute('SELECT codigo FROM produtos WHERE codigo = ?', (produto_data['codigo'],))
                 if cursor.fetchone():
-                    logger.error(f"Product code {produto_data['codigo']} already exists")
+                    logger.error("Product code %s already exists", produto_data['codigo'])
                     return False
                 
                 # Insert new product
@@ -352,11 +352,11 @@ class LocalDatabase:
                 ))
                 
                 conn.commit()
-                logger.info(f"Product {produto_data['codigo']} created successfully")
+                logger.info("Product %s created successfully", produto_data['codigo'])
                 return True
                 
         except Exception as e:
-            logger.error(f"Error creating product: {e}")
+            logger.error("Error creating product: %s", e)
             return False
     
     def update_product(self, codigo: str, produto_data: Dict[str, Any]) -> bool:
@@ -368,7 +368,7 @@ class LocalDatabase:
                 # Check if product exists
                 cursor.execute('SELECT codigo FROM produtos WHERE codigo = ?', (codigo,))
                 if not cursor.fetchone():
-                    logger.error(f"Product {codigo} not found")
+                    logger.error("Product %s not found", codigo)
                     return False
                 
                 # Update product
@@ -401,11 +401,11 @@ class LocalDatabase:
                 ))
                 
                 conn.commit()
-                logger.info(f"Product {codigo} updated successfully")
+                logger.info("Product %s updated successfully", codigo)
                 return True
                 
         except Exception as e:
-            logger.error(f"Error updating product: {e}")
+            logger.error("Error updating product: %s", e)
             return False
     
     def delete_product(self, codigo: str) -> bool:
@@ -417,18 +417,18 @@ class LocalDatabase:
                 # Check if product exists
                 cursor.execute('SELECT codigo FROM produtos WHERE codigo = ?', (codigo,))
                 if not cursor.fetchone():
-                    logger.error(f"Product {codigo} not found")
+                    logger.error("Product %s not found", codigo)
                     return False
                 
                 # Delete product
                 cursor.execute('DELETE FROM produtos WHERE codigo = ?', (codigo,))
                 
                 conn.commit()
-                logger.info(f"Product {codigo} deleted successfully")
+                logger.info("Product %s deleted successfully", codigo)
                 return True
                 
         except Exception as e:
-            logger.error(f"Error deleting product: {e}")
+            logger.error("Error deleting product: %s", e)
             return False
     
     def check_product_code_exists(self, codigo: str) -> bool:
@@ -440,5 +440,5 @@ class LocalDatabase:
                 return cursor.fetchone() is not None
                 
         except Exception as e:
-            logger.error(f"Error checking product code: {e}")
+            logger.error("Error checking product code: %s", e)
             return False
\ No newline at end of file
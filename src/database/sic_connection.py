@@ -78,7 +78,7 @@ class SICConnection:
             return conn_str
             
         except Exception as e:
-            logger.error(f"Error building connection string: {e}")
+            logger.error("Error building connection string: %s", e)
             raise
     
     def test_connection(self) -> tuple[bool, str]:
@@ -116,7 +116,7 @@ class SICConnection:
             yield conn
             
         except Exception as e:
-            logger.error(f"Database connection error: {e}")
+            logger.error("Database connection error: %s", e)
             if conn:
                 conn.rollback()
             raise
@@ -146,7 +146,7 @@ class SICConnection:
                 return results
                 
         except Exception as e:
-            logger.error(f"Query execution error: {e}")
+            logger.error("Query execution error: %s", e)
             raise
     
     def execute_command(self, command: str, params: tuple = None) -> int:
@@ -164,7 +164,7 @@ class SICConnection:
                 return cursor.rowcount
                 
         except Exception as e:
-            logger.error(f"Command execution error: {e}")
+            logger.error("Command execution error: %s", e)
             raise
     
     def get_products(self) -> List[Dict[str, Any]]:
@@ -212,5 +212,5 @@ class SICConnection:
             rows_affected = self.execute_command(command, (novo_preco, codigo))
             return rows_affected > 0
         except Exception as e:
-            logger.error(f"Error updating product price: {e}")
+            logger.error("Error updating product price: %s", e)
             return False
\ No newline at end of file
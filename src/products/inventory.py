@@ -74,7 +74,7 @@ class InventoryManager:
             return report
             
         except Exception as e:
-            logger.error(f"Error generating stock report: {e}")
+            logger.error("Error generating stock report: %s", e)
             return {'error': str(e)}
     
     def _get_stock_status(self, stock: int) -> str:
@@ -106,7 +106,7 @@ class InventoryManager:
             return sorted(alerts, key=lambda x: x['estoque_atual'])
             
         except Exception as e:
-            logger.error(f"Error getting low stock alerts: {e}")
+            logger.error("Error getting low stock alerts: %s", e)
             return []
     
     def record_stock_entry(self, codigo: str, quantidade: int, 
@@ -131,13 +131,13 @@ class InventoryManager:
                     product_data['atualizado_em'] = datetime.now().isoformat()
                     self.product_manager.local_db.insert_or_update_product(product_data)
                     
-                    logger.info(f"Stock entry recorded: {codigo} +{quantidade}")
+                    logger.info("Stock entry recorded: %s +%s", codigo, quantidade)
                     return True
             
             return False
             
         except Exception as e:
-            logger.error(f"Error recording stock entry: {e}")
+            logger.error("Error recording stock entry: %s", e)
             return False
     
     def record_stock_adjustment(self, codigo: str, nova_quantidade: int, 
@@ -146,7 +146,7 @@ class InventoryManager:
         try:
             product_data = self.product_manager.local_db.get_product_by_code(codigo)
             if not product_data:
-                logger.error(f"Product {codigo} not found for stock adjustment")
+                logger.error("Product %s not found for stock adjustment", codigo)
                 return False
             
             quantidade_atual = product_data['estoque_atual']
@@ -171,13 +171,13 @@ class InventoryManager:
                 product_data['atualizado_em'] = datetime.now().isoformat()
                 self.product_manager.local_db.insert_or_update_product(product_data)
                 
-                logger.info(f"Stock adjusted: {codigo} {quantidade_atual} -> {nova_quantidade}")
+                logger.info("Stock adjusted: %s %s -> %s", codigo, quantidade_atual, nova_quantidade)
                 return True
             
             return False
             
         except Exception as e:
-            logger.error(f"Error adjusting stock: {e}")
+            logger.error("Error adjusting stock: %s", e)
             return False
     
     def get_movement_history(self, codigo: str = None, days: int = 30) -> List[Dict[str, Any]]:
@@ -206,7 +206,7 @@ class InventoryManager:
             return sorted(filtered_movements, key=lambda x: x['data_movimento'], reverse=True)
             
         except Exception as e:
-            logger.error(f"Error getting movement history: {e}")
+            logger.error("Error getting movement history: %s", e)
             return []
     
     def calculate_reorder_suggestions(self) -> List[Dict[str, Any]]:
@@ -233,7 +233,7 @@ class InventoryManager:
             return sorted(suggestions, key=lambda x: x['estoque_atual'])
             
         except Exception as e:
-            logger.error(f"Error calculating reorder suggestions: {e}")
+            logger.error("Error calculating reorder suggestions: %s", e)
             return []
     
     def export_inventory_csv(self, filepath: str) -> bool:
@@ -261,9 +261,9 @@ class InventoryManager:
                         'status': self._get_stock_status(product.estoque_atual)
                     })
             
-            logger.info(f"Inventory exported to {filepath}")
+            logger.info("Inventory exported to %s", filepath)
             return True
             
         except Exception as e:
-            logger.error(f"Error exporting inventory: {e}")
+            logger.error("Error exporting inventory: %s", e)
             return False
\ No newline at end of file
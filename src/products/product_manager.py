@@ -26,7 +26,7 @@ class ProductManager:
             self.offline_mode = not success
             return success
         except Exception as e:
-            logger.error(f"Error checking SIC connection: {e}")
+            logger.error("Error checking SIC connection: %s", e)
             self.offline_mode = True
             return False
     
@@ -48,7 +48,7 @@ class ProductManager:
                 return [Product.from_dict(p) for p in local_products]
                 
         except Exception as e:
-            logger.error(f"Error getting products: {e}")
+            logger.error("Error getting products: %s", e)
             # Fallback to local database
             local_products = self.local_db.get_all_products()
             return [Product.from_dict(p) for p in local_products]
@@ -70,7 +70,7 @@ class ProductManager:
             return Product.from_dict(local_product) if local_product else None
             
         except Exception as e:
-            logger.error(f"Error getting product {codigo}: {e}")
+            logger.error("Error getting product %s: %s", codigo, e)
             # Fallback to local
             local_product = self.local_db.get_product_by_code(codigo)
             return Product.from_dict(local_product) if local_product else None
@@ -83,7 +83,7 @@ class ProductManager:
             return [Product.from_dict(p) for p in local_products]
             
         except Exception as e:
-            logger.error(f"Error searching products: {e}")
+            logger.error("Error searching products: %s", e)
             return []
     
     def update_product_price(self, codigo: str, novo_preco: Decimal) -> bool:
@@ -112,7 +112,7 @@ class ProductManager:
             return False
             
         except Exception as e:
-            logger.error(f"Error updating product price: {e}")
+            logger.error("Error updating product price: %s", e)
             return False
     
     def record_sale(self, codigo: str, quantidade: int, preco: Decimal) -> bool:
@@ -137,7 +137,7 @@ class ProductManager:
             return success
             
         except Exception as e:
-            logger.error(f"Error recording sale: {e}")
+            logger.error("Error recording sale: %s", e)
             return False
     
     def sync_with_sic(self) -> Dict[str, Any]:
@@ -172,10 +172,10 @@ class ProductManager:
             result['movements_synced'] = movements_synced
             result['success'] = True
             
-            logger.info(f"Sync completed: {products_synced} products, {movements_synced} movements")
+            logger.info("Sync completed: %s products, %s movements", products_synced, movements_synced)
             
         except Exception as e:
-            logger.error(f"Error during sync: {e}")
+            logger.error("Error during sync: %s", e)
             result['errors'].append(str(e))
         
         return result
@@ -187,7 +187,7 @@ class ProductManager:
             return [p for p in all_products if p.estoque_atual <= threshold]
             
         except Exception as e:
-            logger.error(f"Error getting low stock products: {e}")
+            logger.error("Error getting low stock products: %s", e)
             return []
     
     def get_product_categories(self) -> List[str]:
@@ -203,7 +203,7 @@ class ProductManager:
             return sorted(list(categories))
             
         except Exception as e:
-            logger.error(f"Error getting categories: {e}")
+            logger.error("Error getting categories: %s", e)
             return []
     
     def get_products_by_category(self, categoria: str) -> List[Product]:
@@ -213,7 +213,7 @@ class ProductManager:
             return [p for p in all_products if p.categoria == categoria]
             
         except Exception as e:
-            logger.error(f"Error getting products by category: {e}")
+            logger.error("Error getting products by category: %s", e)
             return []
     
     def get_sync_status(self) -> Dict[str, Any]:
@@ -229,7 +229,7 @@ class ProductManager:
             }
             
         except Exception as e:
-            logger.error(f"Error getting sync status: {e}")
+            logger.error("Error getting sync status: %s", e)
             return {'status': 'error', 'offline_mode': True}
     
     def create_product(self, produto_data: Dict[str, Any]) -> bool:
@@ -239,7 +239,7 @@ class ProductManager:
             required_fields = ['codigo', 'descricao', 'preco_venda']
             for field in required_fields:
                 if not produto_data.get(field):
-                    logger.error(f"Missing required field: {field}")
+                    logger.error("Missing required field: %s", field)
                     return False
             
             # Validate price
@@ -257,12 +257,12 @@ class ProductManager:
             success = self.local_db.create_product(produto_data)
             
             if success:
-                logger.info(f"Product {produto_data['codigo']} created successfully")
+                logger.info("Product %s created successfully", produto_data['codigo'])
             
             return success
             
         except Exception as e:
-            logger.error(f"Error creating product: {e}")
+            logger.error("Error creating product: %s", e)
             return False
     
     def update_product(self, codigo: str, produto_data: Dict[str, Any]) -> bool:
@@ -272,7 +272,7 @@ class ProductManager:
             required_fields = ['descricao', 'preco_venda']
             for field in required_fields:
                 if field in produto_data and not produto_data[field]:
-                    logger.error(f"Missing required field: {field}")
+                    logger.error("Missing required field: %s", field)
                     return False
             
             # Validate price if provided
@@ -291,12 +291,12 @@ class ProductManager:
             success = self.local_db.update_product(codigo, produto_data)
             
             if success:
-                logger.info(f"Product {codigo} updated successfully")
+                logger.info("Product %s updated successfully", codigo)
             
             return success
             
         except Exception as e:
-            logger.error(f"Error updating product: {e}")
+            logger.error("Error updating product: %s", e)
             return False
     
     def delete_product(self, codigo: str) -> bool:
@@ -305,12 +305,12 @@ class ProductManager:
             success = self.local_db.delete_product(codigo)
             
             if success:
-                logger.info(f"Product {codigo} deleted successfully")
+                logger.info("Product %s deleted successfully", codigo)
             
             return success
             
         except Exception as e:
-            logger.error(f"Error deleting product: {e}")
+            logger.error("Error deleting product: %s", e)
             return False
     
     def validate_product_data(self, produto_data: Dict[str, Any], is_update: bool = False) -> List[str]:
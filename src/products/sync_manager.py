@@ -39,7 +39,7 @@ class SyncManager:
             try:
                 callback(result)
             except Exception as e:
-                logger.error(f"Error in sync callback: {e}")
+                logger.error("Error in sync callback: %s", e)
     
     def start_auto_sync(self):
         """Start automatic synchronization in background thread"""
@@ -75,7 +75,7 @@ class SyncManager:
                     time.sleep(1)
                     
             except Exception as e:
-                logger.error(f"Error in sync loop: {e}")
+                logger.error("Error in sync loop: %s", e)
                 time.sleep(30)  # Wait 30 seconds before retrying
     
     def perform_sync(self, force: bool = False) -> Dict[str, Any]:
@@ -112,9 +112,9 @@ class SyncManager:
             })
             
             if result['success']:
-                logger.info(f"Sync completed successfully: {result['products_synced']} products, {result['movements_synced']} movements")
+                logger.info("Sync completed successfully: %s products, %s movements", result['products_synced'], result['movements_synced'])
             else:
-                logger.warning(f"Sync completed with errors: {result['errors']}")
+                logger.warning("Sync completed with errors: %s", result['errors'])
                 
         except Exception as e:
             error_msg = f"Sync failed with exception: {e}"
@@ -156,7 +156,7 @@ class SyncManager:
             return False
             
         except Exception as e:
-            logger.error(f"Error checking if should sync: {e}")
+            logger.error("Error checking if should sync: %s", e)
             return False
     
     def force_sync(self) -> Dict[str, Any]:
@@ -166,7 +166,7 @@ class SyncManager:
     def set_sync_interval(self, interval: int):
         """Set synchronization interval in seconds"""
         self.sync_interval = max(60, interval)  # Minimum 1 minute
-        logger.info(f"Sync interval set to {self.sync_interval} seconds")
+        logger.info("Sync interval set to %s seconds", self.sync_interval)
     
     def enable_auto_sync(self):
         """Enable automatic synchronization"""
@@ -202,7 +202,7 @@ class SyncManager:
             return stats
             
         except Exception as e:
-            logger.error(f"Error getting sync statistics: {e}")
+            logger.error("Error getting sync statistics: %s", e)
             return {'error': str(e)}
     
     def test_sync_connection(self) -> Dict[str, Any]:
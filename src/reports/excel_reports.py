@@ -138,7 +138,7 @@ class ExcelReportGenerator:
             return {'success': True, 'filename': filename, 'total_records': len(data)}
             
         except Exception as e:
-            logger.error(f"Error generating Excel products report: {e}")
+            logger.error("Error generating Excel products report: %s", e)
             return {'success': False, 'error': str(e)}
     
     def generate_inventory_report(self, stock_data: Dict[str, Any], config: ReportConfig) -> Dict[str, Any]:
@@ -220,7 +220,7 @@ class ExcelReportGenerator:
             return {'success': True, 'filename': filename}
             
         except Exception as e:
-            logger.error(f"Error generating Excel inventory report: {e}")
+            logger.error("Error generating Excel inventory report: %s", e)
             return {'success': False, 'error': str(e)}
     
     def generate_low_stock_report(self, alerts: List[Dict[str, Any]], config: ReportConfig) -> Dict[str, Any]:
@@ -271,7 +271,7 @@ class ExcelReportGenerator:
             return {'success': True, 'filename': filename, 'total_alerts': len(alerts)}
             
         except Exception as e:
-            logger.error(f"Error generating Excel low stock report: {e}")
+            logger.error("Error generating Excel low stock report: %s", e)
             return {'success': False, 'error': str(e)}
     
     def generate_price_list(self, price_data: List[Dict[str, Any]], config: ReportConfig) -> Dict[str, Any]:
@@ -327,7 +327,7 @@ class ExcelReportGenerator:
             return {'success': True, 'filename': filename, 'total_items': len(price_data)}
             
         except Exception as e:
-            logger.error(f"Error generating Excel price list: {e}")
+            logger.error("Error generating Excel price list: %s", e)
             return {'success': False, 'error': str(e)}
     
     def generate_category_report(self, categories: Dict[str, Dict], config: ReportConfig) -> Dict[str, Any]:
@@ -381,7 +381,7 @@ class ExcelReportGenerator:
             return {'success': True, 'filename': filename, 'categories_count': len(categories)}
             
         except Exception as e:
-            logger.error(f"Error generating Excel category report: {e}")
+            logger.error("Error generating Excel category report: %s", e)
             return {'success': False, 'error': str(e)}
     
     def generate_reorder_report(self, suggestions: List[Dict[str, Any]], config: ReportConfig) -> Dict[str, Any]:
@@ -430,7 +430,7 @@ class ExcelReportGenerator:
             return {'success': True, 'filename': filename, 'suggestions_count': len(suggestions)}
             
         except Exception as e:
-            logger.error(f"Error generating Excel reorder report: {e}")
+            logger.error("Error generating Excel reorder report: %s", e)
             return {'success': False, 'error': str(e)}
     
     def _save_workbook(self, wb: Workbook, prefix: str) -> str:
@@ -439,5 +439,5 @@ class ExcelReportGenerator:
         filename = f"{prefix}_{timestamp}.xlsx"
         filepath = os.path.join(self.output_dir, filename)
         wb.save(filepath)
-        logger.info(f"Excel report saved: {filepath}")
+        logger.info("Excel report saved: %s", filepath)
         return filename
\ No newline at end of file
@@ -62,7 +62,7 @@ class ReportGenerator:
                 raise ValueError(f"Unsupported report type: {config.tipo}")
                 
         except Exception as e:
-            logger.error(f"Error generating products report: {e}")
+            logger.error("Error generating products report: %s", e)
             return {'success': False, 'error': str(e)}
     
     def generate_inventory_report(self, config: ReportConfig) -> Dict[str, Any]:
@@ -78,7 +78,7 @@ class ReportGenerator:
                 raise ValueError(f"Unsupported report type: {config.tipo}")
                 
         except Exception as e:
-            logger.error(f"Error generating inventory report: {e}")
+            logger.error("Error generating inventory report: %s", e)
             return {'success': False, 'error': str(e)}
     
     def generate_low_stock_report(self, config: ReportConfig, threshold: int = 5) -> Dict[str, Any]:
@@ -94,7 +94,7 @@ class ReportGenerator:
                 raise ValueError(f"Unsupported report type: {config.tipo}")
                 
         except Exception as e:
-            logger.error(f"Error generating low stock report: {e}")
+            logger.error("Error generating low stock report: %s", e)
             return {'success': False, 'error': str(e)}
     
     def generate_price_list(self, config: ReportConfig) -> Dict[str, Any]:
@@ -123,7 +123,7 @@ class ReportGenerator:
                 raise ValueError(f"Unsupported report type: {config.tipo}")
                 
         except Exception as e:
-            logger.error(f"Error generating price list: {e}")
+            logger.error("Error generating price list: %s", e)
             return {'success': False, 'error': str(e)}
     
     def generate_category_report(self, config: ReportConfig) -> Dict[str, Any]:
@@ -156,7 +156,7 @@ class ReportGenerator:
                 raise ValueError(f"Unsupported report type: {config.tipo}")
                 
         except Exception as e:
-            logger.error(f"Error generating category report: {e}")
+            logger.error("Error generating category report: %s", e)
             return {'success': False, 'error': str(e)}
     
     def generate_reorder_report(self, config: ReportConfig) -> Dict[str, Any]:
@@ -172,7 +172,7 @@ class ReportGenerator:
                 raise ValueError(f"Unsupported report type: {config.tipo}")
                 
         except Exception as e:
-            logger.error(f"Error generating reorder report: {e}")
+            logger.error("Error generating reorder report: %s", e)
             return {'success': False, 'error': str(e)}
     
     def _apply_filters(self, product_data: Dict[str, Any], filtros: Optional[Dict[str, Any]]) -> bool:
@@ -207,7 +207,7 @@ class ReportGenerator:
             return True
             
         except Exception as e:
-            logger.error(f"Error applying filters: {e}")
+            logger.error("Error applying filters: %s", e)
             return True
     
     def get_available_reports(self) -> List[Dict[str, Any]]:
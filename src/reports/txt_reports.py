@@ -94,7 +94,7 @@ class TxtReportGenerator:
             return {'success': True, 'filename': filename, 'total_records': len(data)}
             
         except Exception as e:
-            logger.error(f"Error generating text products report: {e}")
+            logger.error("Error generating text products report: %s", e)
             return {'success': False, 'error': str(e)}
     
     def generate_inventory_report(self, stock_data: Dict[str, Any], config: ReportConfig) -> Dict[str, Any]:
@@ -158,7 +158,7 @@ class TxtReportGenerator:
             return {'success': True, 'filename': filename}
             
         except Exception as e:
-            logger.error(f"Error generating text inventory report: {e}")
+            logger.error("Error generating text inventory report: %s", e)
             return {'success': False, 'error': str(e)}
     
     def generate_low_stock_report(self, alerts: List[Dict[str, Any]], config: ReportConfig) -> Dict[str, Any]:
@@ -236,7 +236,7 @@ class TxtReportGenerator:
             return {'success': True, 'filename': filename, 'total_alerts': len(alerts)}
             
         except Exception as e:
-            logger.error(f"Error generating text low stock report: {e}")
+            logger.error("Error generating text low stock report: %s", e)
             return {'success': False, 'error': str(e)}
     
     def generate_price_list(self, price_data: List[Dict[str, Any]], config: ReportConfig) -> Dict[str, Any]:
@@ -265,7 +265,7 @@ class TxtReportGenerator:
             return {'success': True, 'filename': filename, 'total_items': len(price_data)}
             
         except Exception as e:
-            logger.error(f"Error generating text price list: {e}")
+            logger.error("Error generating text price list: %s", e)
             return {'success': False, 'error': str(e)}
     
     def generate_category_report(self, categories: Dict[str, Dict], config: ReportConfig) -> Dict[str, Any]:
@@ -310,7 +310,7 @@ class TxtReportGenerator:
             return {'success': True, 'filename': filename, 'categories_count': len(categories)}
             
         except Exception as e:
-            logger.error(f"Error generating text category report: {e}")
+            logger.error("Error generating text category report: %s", e)
             return {'success': False, 'error': str(e)}
     
     def generate_reorder_report(self, suggestions: List[Dict[str, Any]], config: ReportConfig) -> Dict[str, Any]:
@@ -372,7 +372,7 @@ class TxtReportGenerator:
             return {'success': True, 'filename': filename, 'suggestions_count': len(suggestions)}
             
         except Exception as e:
-            logger.error(f"Error generating text reorder report: {e}")
+            logger.error("Error generating text reorder report: %s", e)
             return {'success': False, 'error': str(e)}
     
     def _save_report(self, content: str, prefix: str) -> str:
@@ -384,5 +384,5 @@ class TxtReportGenerator:
         with open(filepath, 'w', encoding='utf-8') as f:
             f.write(content)
         
-        logger.info(f"Text report saved: {filepath}")
+        logger.info("Text report saved: %s", filepath)
         return filename
\ No newline at end of file
@@ -4,6 +4,7 @@ Provides comprehensive product validation with real-time feedback
 """
 import sqlite3
 import re
+from collections import OrderedDict
 from typing import Dict, List, Optional, Any, Tuple
 from decimal import Decimal, InvalidOperation
 
@@ -11,8 +12,17 @@ from decimal import Decimal, InvalidOperation
 class ProductValidator:
     """Enhanced product validation with real-time feedback"""
     
+    # Patterns compiled once, shared by all instances
+    _CODIGO_RE = re.compile(r'^[A-Za-z0-9_-]+$')
+    _DESCRICAO_INVALIDA_RE = re.compile(r'[<>"]')
+    
+    # Max number of code lookups remembered by _code_exists
+    _CODE_CACHE_SIZE = 512
+    
     def __init__(self, db_path: str = "dados/produtos_sic.db"):
         self.db_path = db_path
+        self._conn = None  # Opened on the first code lookup and kept for reuse
+        self._code_cache = OrderedDict()  # codigo -> exists (LRU, most recent last)
         
     def validate_required_fields(self, product_data: Dict[str, Any], is_update: bool = False) -> List[str]:
         """Validate required fields"""
@@ -44,7 +54,7 @@ class ProductValidator:
         codigo = codigo.strip()
         
         # Validate format (alphanumeric, max 20 chars)
-        if not re.match(r'^[A-Za-z0-9_-]+$', codigo):
+        if not self._CODIGO_RE.match(codigo):
             errors.append("Código deve conter apenas letras, números, _ ou -")
         
         if len(codigo) > 20:
@@ -77,7 +87,7 @@ class ProductValidator:
             errors.append("Descrição deve ter no máximo 200 caracteres")
         
         # Check for suspicious characters
-        if re.search(r'[<>"]', descricao):
+        if self._DESCRICAO_INVALIDA_RE.search(descricao):
             errors.append("Descrição contém caracteres não permitidos")
         
         return errors
@@ -256,25 +266,38 @@ class ProductValidator:
     
     def _code_exists(self, codigo: str) -> bool:
         """Check if product code exists in database"""
+        if codigo in self._code_cache:
+            self._code_cache.move_to_end(codigo)
+            return self._code_cache[codigo]
+        
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
+            if self._conn is None:
+                self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
             
-            cursor.execute("SELECT 1 FROM produtos WHERE codigo = ? LIMIT 1", (codigo,))
+            cursor = self._conn.execute("SELECT 1 FROM produtos WHERE codigo = ? LIMIT 1", (codigo,))
             exists = cursor.fetchone() is not None
             
-            conn.close()
-            return exists
-            
         except sqlite3.Error:
-            return False  # Assume doesn't exist if we can't check
+            return False  # Assume doesn't exist if we can't check (not cached)
+        
+        self._code_cache[codigo] = exists
+        if len(self._code_cache) > self._CODE_CACHE_SIZE:
+            self._code_cache.popitem(last=False)
+        return exists
+    
+    def forget_code(self, codigo: Optional[str] = None):
+        """Drop a cached code lookup after the product table changes (all codes if None)"""
+        if codigo is None:
+            self._code_cache.clear()
+        else:
+            self._code_cache.pop(str(codigo), None)
     
     def get_validation_suggestions(self, field_name: str, value: str) -> List[str]:
         """Get real-time validation suggestions"""
         suggestions = []
         
         if field_name == 'codigo':
-            if value and not re.match(r'^[A-Za-z0-9_-]+$', value):
+            if value and not self._CODIGO_RE.match(value):
                 suggestions.append("Use apenas letras, números, _ ou -")
             if len(value) > 20:
                 suggestions.append("Máximo 20 caracteres")
@@ -118,6 +118,48 @@ def test_validation_edge_cases():
     
     print("✅ All edge case tests passed!")
 
+def test_cart_numeric_codes():
+    """Test cart removal for numeric product codes (Treeview turns '001' into 1)"""
+    print("🛒 Testing Cart Removal...")
+    
+    from unittest import mock
+    import main
+    
+    app = main.SistemaPDV.__new__(main.SistemaPDV)
+    app.carrinho = {}
+    app._carrinho_iids = {}
+    app._carrinho_subtotal = 0.0
+    app.label_subtotal = mock.Mock()
+    app.label_total = mock.Mock()
+    app.log = mock.Mock()
+    app.tree_carrinho = mock.Mock()
+    app.tree_carrinho.insert.side_effect = ["I001", "I002"]
+    app.tree_produtos_pdv = mock.Mock()
+    app.tree_produtos_pdv.selection.return_value = ("P1",)
+    app._pdv_linhas = [("001", 10.0), ("123", 2.5)]
+    
+    with mock.patch.object(main.simpledialog, "askinteger", return_value=2):
+        for indice, valores in enumerate(([1, "Tábua", "R$ 10.00", 5], [123, "Prego", "R$ 2.50", 50])):
+            app.tree_produtos_pdv.index.return_value = indice
+            app.tree_produtos_pdv.item.return_value = {'values': valores}
+            app.adicionar_ao_carrinho()
+    
+    assert set(app.carrinho) == {"001", "123"}, f"Unexpected cart keys: {list(app.carrinho)}"
+    assert abs(app._carrinho_subtotal - 25.0) < 1e-9
+    
+    # The cell would come back as an int; removal must still find the item
+    app.tree_carrinho.selection.return_value = ("I001",)
+    app.tree_carrinho.item.return_value = {'values': [1, "Tábua", 2, "R$ 10.00", "R$ 20.00"]}
+    app.remover_do_carrinho()
+    assert "001" not in app.carrinho, "Leading-zero code stayed in the cart"
+    assert abs(app._carrinho_subtotal - 5.0) < 1e-9, f"Subtotal not reduced: {app._carrinho_subtotal}"
+    
+    app.tree_carrinho.selection.return_value = ("I002",)
+    app.tree_carrinho.item.return_value = {'values': [123, "Prego", 2, "R$ 2.50", "R$ 5.00"]}
+    app.remover_do_carrinho()
+    assert not app.carrinho and app._carrinho_subtotal == 0.0, "All-digit code stayed in the cart"
+    print("✅ Cart removal with numeric codes passed")
+
 if __name__ == "__main__":
     print("🧪 Running Enhanced Validation Tests\n")
     
@@ -127,6 +169,8 @@ if __name__ == "__main__":
         test_secure_config()
         print()
         test_validation_edge_cases()
+        print()
+        test_cart_numeric_codes()
         
         print("\n🎉 All tests passed successfully!")
         